@@ -0,0 +1,358 @@
+"""
+Load tests the dashboard with concurrent simulated sessions against one local server
+
+Example:
+    python benchmarks/load_test.py --sessions 1 8 32 --steps 20 --json load.json
+
+Every run starts `streamlit run src/streamlit_app.py` on a free localhost port and connects
+its sessions to that server over the websocket a browser uses. The sessions share the
+server's process wide caches (frames, figures and the mapped release) and its locks, so the
+run measures the contention between them and how the shared caches warm up: the very first
+rerun of a run is reported separately as the cold rerun. Each session replays a random
+interaction script (switching the year or region, toggling dimension checkboxes,
+multi-selecting countries) and every rerun is timed from sending the widget states to the
+script finishing. Sessions are seeded, so a run can be repeated exactly.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from contextlib import contextmanager
+
+import numpy as np
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from websockets.asyncio.client import connect
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+APP_PATH = os.path.join(ROOT_DIR, "src", "streamlit_app.py")
+
+# share of each kind of interaction in the scripts
+ACTIONS = {"year": 0.3, "region": 0.3, "dimension": 0.2, "countries": 0.2}
+DIMENSION_KEYS = ["health", "education", "ls", "health_2", "education_2", "ls_2"]
+
+# widgets whose value the sessions send back, the others keep their defaults
+WIDGET_TYPES = ("selectbox", "multiselect", "checkbox")
+
+# seconds a server may take to start, and a rerun to finish
+START_TIMEOUT = 60
+RERUN_TIMEOUT = 120
+
+def free_port() -> int:
+    """
+    Returns a localhost port nothing listens on
+
+    Returns:
+        int: Port number
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def server_memory_mib(pid: int) -> tuple[float | None, float | None]:
+    """
+    Returns the current and peak resident memory of a process
+
+    Args:
+        pid (int): Process id
+
+    Returns:
+        tuple[float | None, float | None]: RSS and peak RSS in MiB, None where /proc is not
+            available
+    """
+    memory = {}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(("VmRSS:", "VmHWM:")):
+                    memory[line.split(":")[0]] = int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return memory.get("VmRSS"), memory.get("VmHWM")
+
+@contextmanager
+def serve(port: int):
+    """
+    Runs the dashboard on a localhost port until the block completes
+
+    Args:
+        port (int): Port to serve on
+
+    Yields:
+        subprocess.Popen: Server process, once it answers its health check
+    """
+    command = [sys.executable, "-m", "streamlit", "run", APP_PATH, "--server.headless", "true",
+               "--server.address", "127.0.0.1", "--server.port", str(port), "--server.fileWatcherType", "none",
+               "--browser.gatherUsageStats", "false", "--logger.level", "error"]
+    server = subprocess.Popen(command, cwd= ROOT_DIR, stdout= subprocess.DEVNULL, stderr= subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + START_TIMEOUT
+        while True:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout= 1) as response:
+                    if response.status == 200:
+                        break
+            except OSError:
+                if server.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"The dashboard server did not start on port {port}.")
+                time.sleep(0.2)
+        yield server
+    finally:
+        server.terminate()
+        server.wait()
+
+class Session:
+    """
+    One browser session of the dashboard, holding its widgets and their values
+
+    Widgets are named by their key, or by their label when they have none, so a widget keeps
+    its value when its id changes with its options.
+
+    Args:
+        websocket: Open connection to the server's /_stcore/stream endpoint
+    """
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.widgets = {}
+        self.values = {}
+
+    @staticmethod
+    def _name(widget) -> str:
+        key = widget.id.rsplit("-", 1)[-1]
+        return key if key != "None" else widget.label or "section"
+
+    def _state(self, kind: str, widget) -> WidgetState | None:
+        options = list(getattr(widget, "options", []))
+        value = self.values.get(self._name(widget))
+        state = WidgetState(id= widget.id)
+        if kind == "checkbox":
+            state.bool_value = widget.default if value is None else value
+        elif kind == "selectbox":
+            state.string_value = value if value in options else options[widget.default]
+        else:
+            valid = value is not None and set(value) <= set(options)
+            state.string_array_value.data[:] = value if valid else [options[i] for i in widget.default]
+        return state
+
+    async def rerun(self) -> list[str]:
+        """
+        Reruns the script with the current widget values and waits for it to finish
+
+        Returns:
+            list[str]: Messages of the exceptions the script showed
+        """
+        message = BackMsg()
+        message.rerun_script.query_string = ""
+        for kind, widget in self.widgets.values():
+            message.rerun_script.widget_states.widgets.append(self._state(kind, widget))
+        await self.websocket.send(message.SerializeToString())
+
+        self.widgets, errors = {}, []
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await asyncio.wait_for(self.websocket.recv(), RERUN_TIMEOUT))
+            kind = forward.WhichOneof("type")
+            if kind == "script_finished":
+                return errors
+            if kind != "delta" or forward.delta.WhichOneof("type") != "new_element":
+                continue
+
+            element = forward.delta.new_element
+            element_type = element.WhichOneof("type")
+            if element_type in WIDGET_TYPES:
+                widget = getattr(element, element_type)
+                self.widgets[self._name(widget)] = (element_type, widget)
+            elif element_type == "exception":
+                errors.append(element.exception.message)
+
+    def options(self, name: str) -> list:
+        """
+        Returns the options of a widget drawn by the last rerun
+
+        Args:
+            name (str): Widget name, its key or label
+
+        Returns:
+            list: Options
+
+        Raises:
+            KeyError: The last rerun did not draw the widget
+        """
+        return list(self.widgets[name][1].options)
+
+    def value(self, name: str):
+        """
+        Returns the value a widget is sent with on the next rerun
+
+        Args:
+            name (str): Widget name, its key or label
+
+        Returns:
+            Any: Value of the widget
+
+        Raises:
+            KeyError: The last rerun did not draw the widget
+        """
+        kind, widget = self.widgets[name]
+        state = self._state(kind, widget)
+        return getattr(state, state.WhichOneof("value"))
+
+def interact(session: Session, rng: random.Random) -> str:
+    """
+    Applies one random interaction to a session, without rerunning it
+
+    Sessions whose last rerun failed may lack the widget, they are just rerun.
+
+    Args:
+        session (Session): Session
+        rng (random.Random): Random generator of the session
+
+    Returns:
+        str: Kind of interaction
+    """
+    action = rng.choices(list(ACTIONS), weights= list(ACTIONS.values()))[0]
+    try:
+        apply(session, action, rng)
+    except (IndexError, KeyError, ValueError):
+        return "rerun"
+    return action
+
+def apply(session: Session, action: str, rng: random.Random):
+    """
+    Changes the widget of an interaction
+
+    Args:
+        session (Session): Session
+        action (str): Kind of interaction, one of ACTIONS
+        rng (random.Random): Random generator of the session
+    """
+    if action == "year":
+        session.values["Selected Year"] = rng.choice(session.options("Selected Year"))
+    elif action == "region":
+        session.values["Selected Region"] = rng.choice(session.options("Selected Region"))
+    elif action == "dimension":
+        key = rng.choice(DIMENSION_KEYS)
+        session.values[key] = not session.value(key)
+    else:
+        name = [name for name, (kind, _) in session.widgets.items() if kind == "multiselect"][0]
+        options = session.options(name)
+        session.values[name] = rng.sample(options, rng.randint(1, min(3, len(options))))
+
+async def session(index: int, steps: int, seed: int, think: float, url: str) -> dict:
+    """
+    Runs one simulated session and times each of its reruns
+
+    Args:
+        index (int): Session number, combined with the seed
+        steps (int): Interactions after opening the dashboard
+        seed (int): Seed of the interaction scripts
+        think (float): Seconds waited between interactions
+        url (str): Websocket URL of the server
+
+    Returns:
+        dict: Rerun latencies in seconds, interaction kinds, error messages, and the monotonic
+            times the first rerun started and the session ended
+    """
+    rng = random.Random(seed * 100003 + index)
+    latencies, actions, errors = [], [], []
+
+    async with connect(url, subprotocols= ["streamlit"], max_size= None) as websocket:
+        state = Session(websocket)
+        started = time.monotonic()
+
+        async def rerun(action: str):
+            start = time.perf_counter()
+            messages = await state.rerun()
+            latencies.append(time.perf_counter() - start)
+            actions.append(action)
+            errors.extend(f"{action}: {message}" for message in messages)
+
+        await rerun("open")
+        for _ in range(steps):
+            if think:
+                await asyncio.sleep(think)
+            await rerun(interact(state, rng))
+    return {"latencies": latencies, "actions": actions, "errors": errors, "start": started, "end": time.monotonic()}
+
+def run(n_sessions: int, steps: int, seed: int = 0, think: float = 0.0) -> dict:
+    """
+    Runs concurrent sessions against a fresh server and summarizes their reruns
+
+    Throughput is measured from the first session starting to the last one finishing, so the
+    start up of the server isn't counted.
+
+    Args:
+        n_sessions (int): Number of concurrent sessions
+        steps (int): Interactions per session
+        seed (int): Seed of the interaction scripts
+        think (float): Seconds each session waits between interactions
+
+    Returns:
+        dict: Latency percentiles in ms, the cold first rerun in ms, throughput in reruns per
+            second, errors and the server's memory in MiB
+    """
+    port = free_port()
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+
+    async def sessions() -> list[dict]:
+        return await asyncio.gather(*(session(i, steps, seed, think, url) for i in range(n_sessions)))
+
+    with serve(port) as server:
+        idle_rss, _ = server_memory_mib(server.pid)
+        results = asyncio.run(sessions())
+        rss, max_rss = server_memory_mib(server.pid)
+    wall = max(result["end"] for result in results) - min(result["start"] for result in results)
+
+    latencies = np.array([latency for result in results for latency in result["latencies"]]) * 1000
+    interactions = np.array([latency for result in results
+                             for latency, action in zip(result["latencies"], result["actions"])
+                             if action != "open"]) * 1000
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    first = min(results, key= lambda result: result["start"])
+    return {
+        "sessions": n_sessions, "reruns": len(latencies), "errors": sum(len(result["errors"]) for result in results),
+        "p50_ms": p50, "p95_ms": p95, "p99_ms": p99, "cold_ms": first["latencies"][0] * 1000,
+        "interaction_p50_ms": float(np.percentile(interactions, 50)) if len(interactions) else None,
+        "throughput_rps": len(latencies) / wall, "wall_s": wall,
+        "rss_mib": rss, "session_rss_mib": (rss - idle_rss) / n_sessions if rss and idle_rss else None,
+        "max_rss_mib": max_rss,
+        "error_messages": sorted({error for result in results for error in result["errors"]}),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description= "Load tests the dashboard with concurrent sessions on one server")
+    parser.add_argument("--sessions", type= int, nargs= "+", default= [1, 4, 16],
+                        help= "Numbers of concurrent sessions, one run and server each")
+    parser.add_argument("--steps", type= int, default= 10, help= "Interactions per session")
+    parser.add_argument("--think", type= float, default= 0.0, help= "Seconds between interactions")
+    parser.add_argument("--seed", type= int, default= 0, help= "Seed of the interaction scripts")
+    parser.add_argument("--json", default= None, help= "Also write the results to this file")
+    args = parser.parse_args()
+
+    print(f"{'sessions':>8} {'reruns':>7} {'errors':>6} {'cold ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'reruns/s':>9} {'rss MiB':>8} {'per sess':>8}")
+    results = []
+    for n_sessions in args.sessions:
+        result = run(n_sessions, args.steps, args.seed, args.think)
+        results.append(result)
+        print(f"{n_sessions:>8} {result['reruns']:>7} {result['errors']:>6} {result['cold_ms']:>9.1f} "
+              f"{result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f} "
+              f"{result['throughput_rps']:>9.1f} {result['rss_mib'] or float('nan'):>8.1f} "
+              f"{result['session_rss_mib'] or float('nan'):>8.1f}", flush= True)
+        for message in result["error_messages"]:
+            print(f"    error after {message}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"steps": args.steps, "think": args.think, "seed": args.seed, "results": results}, f, indent= 2)
+
+if __name__ == "__main__":
+    main()
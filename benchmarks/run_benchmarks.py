@@ -0,0 +1,138 @@
+"""
+Benchmarks every pipeline stage and dashboard query on synthetic workbooks
+
+Example:
+    python benchmarks/run_benchmarks.py --countries 2000 --years 24 --repeat 3 --json results.json
+
+Every stage is timed --repeat times (the best time is reported) and run once more under
+tracemalloc to record its peak Python memory. Sheets parsed in worker processes are not
+included in the peak memory of gather_dfs.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+sys.path.insert(0, BENCH_DIR)
+
+import synthetic
+from aggregates import headline, load_cube, over_time
+from countries import country_history, load_country_index
+from data_cache import FRAME_CACHE
+from data_cleaning import gather_dfs, get_regionals, write_derived, write_regionals
+from data_store import cached_frame, load_frame
+from export import export
+from rankings import load_rankings, top_k
+from releases import publish_release, release_frame
+from streaming import stream_rollups
+from uncertainty import build_intervals
+
+def measure(func: Callable, repeat: int) -> dict:
+    """
+    Times a function and records its peak memory
+
+    Args:
+        func (Callable): Function to benchmark, called without arguments
+        repeat (int): Number of timed calls
+
+    Returns:
+        dict: Best and mean time in seconds and peak memory in MiB
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"best_s": min(times), "mean_s": sum(times) / len(times), "peak_mib": peak / 1024 ** 2}
+
+def run(n_countries: int, n_years: int, repeat: int, workers: int | None) -> list[dict]:
+    """
+    Generates the workbooks and benchmarks every stage, from the current directory
+
+    Args:
+        n_countries (int): Rows per workbook
+        n_years (int): Number of workbooks
+        repeat (int): Number of timed calls per stage
+        workers (int | None): Worker processes used to parse the workbooks
+
+    Returns:
+        list[dict]: One result per stage
+    """
+    years = list(range(2000, 2000 + n_years))
+    synthetic.generate(".", years, n_countries)
+    results = []
+
+    def bench(stage: str, func: Callable):
+        result = measure(func, repeat)
+        results.append({"stage": stage, **result})
+        print(f"{stage:<40} {result['best_s'] * 1000:>10.2f} ms {result['peak_mib']:>10.2f} MiB", flush= True)
+
+    state = {}
+    bench("pipeline: gather_dfs (uncached)", lambda: gather_dfs(years, workers, cache_dir= None))
+    gather_dfs(years, workers)
+    bench("pipeline: gather_dfs (cached)", lambda: state.update(year_dfs= gather_dfs(years, workers)))
+    bench("pipeline: get_regionals", lambda: state.update(regionals= get_regionals(years, state["year_dfs"])))
+    bench("pipeline: write_regionals", lambda: write_regionals(state["regionals"]))
+    bench("pipeline: write_derived", write_derived)
+    bench("pipeline: publish_release", lambda: publish_release("bench"))
+    bench("pipeline: export (1 thread)", lambda: export(workers= 1))
+    bench("pipeline: export (parallel)", lambda: export(workers= workers))
+    bench("pipeline: build_intervals (10k resamples)", build_intervals)
+    bench("pipeline: stream_rollups (64 MiB)", lambda: stream_rollups(years[-1], 64))
+    bench("pipeline: stream_rollups (8 MiB)", lambda: stream_rollups(years[-1], 8))
+
+    key, year = "global", years[-1]
+    countries = list(load_frame(key, year, ["Country"])["Country"].iloc[:5])
+    dims = ["Health", "Education", "Living Standards"]
+    window = [year - i for i in range(4)]
+
+    bench("dashboard: load_frame", lambda: load_frame(key, year))
+    FRAME_CACHE.clear()
+    bench("dashboard: cached_frame", lambda: cached_frame(key, year))
+    bench("dashboard: release_frame", lambda: release_frame(key, year))
+    bench("dashboard: headline", lambda: headline(load_cube(), key, year))
+    bench("dashboard: over_time", lambda: over_time(load_cube(), key, window))
+    bench("dashboard: top_k", lambda: top_k(load_rankings(), key, year, dims, "largest", 5))
+    bench("dashboard: country_history", lambda: country_history(load_country_index(), countries))
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description= "Benchmarks the pipeline and dashboard queries on synthetic data")
+    parser.add_argument("--countries", type= int, default= 110, help= "Rows per synthetic workbook")
+    parser.add_argument("--years", type= int, default= 4, help= "Number of synthetic workbooks")
+    parser.add_argument("--repeat", type= int, default= 3, help= "Timed calls per stage")
+    parser.add_argument("--workers", type= int, default= None, help= "Worker processes used to parse the workbooks")
+    parser.add_argument("--json", default= None, help= "Also write the results to this file")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.json) if args.json else None
+    workdir = tempfile.mkdtemp(prefix= "mpi-bench-")
+    cwd = os.getcwd()
+    try:
+        os.chdir(workdir)
+        print(f"{args.countries} rows x {args.years} years, best of {args.repeat}")
+        results = run(args.countries, args.years, args.repeat, args.workers)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors= True)
+
+    if output:
+        with open(output, "w") as f:
+            json.dump({"countries": args.countries, "years": args.years, "results": results}, f, indent= 2)
+
+if __name__ == "__main__":
+    main()
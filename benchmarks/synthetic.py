@@ -0,0 +1,127 @@
+"""
+Writes synthetic "Global MPI National Results" workbooks with the layout of the real releases
+
+The sheets read by the pipeline are written with the columns, header rows and notes of the real
+workbooks, and the schema of every generated year is registered, so gather_dfs parses them
+unchanged.
+"""
+import os
+
+import numpy as np
+from openpyxl import Workbook
+
+from schemas import HEADER_ROWS, national_results_schema, register
+
+REGIONS = ["Arab States", "East Asia and the Pacific", "Europe and Central Asia",
+           "Latin America and the Caribbean", "South Asia", "Sub-Saharan Africa"]
+
+# rows of notes below the tables
+FOOTER_ROWS = {"1.1 National MPI Results": 10, "1.3 Contribut'n of Deprivations": 3, "1.5 SEs & CIs": 4}
+
+# share of each dimension that goes to each of its indicators
+INDICATOR_SPLITS = [(0, 2), (2, 4), (4, 10)]
+
+def _bounds(p: float, error: float) -> list[float]:
+    p = min(max(p, 1e-9), 1 - 1e-9)
+    half = 1.96 * error / (p * (1 - p))
+    # expit written with tanh, which doesn't overflow for tiny shares
+    return [0.5 * (1 + np.tanh((np.log(p / (1 - p)) + side * half) / 2)) for side in (-1, 1)]
+
+def country_rows(year: int, n_countries: int, seed: int = 0) -> dict[str, list]:
+    """
+    Generates the rows of every sheet for one release
+
+    Args:
+        year (int): Release year
+        n_countries (int): Number of countries (or subnational units)
+        seed (int): Seed of the random generator, combined with the year
+
+    Returns:
+        dict[str, list]: Rows of every sheet, by sheet name
+    """
+    rng = np.random.default_rng([seed, year])
+    mpi = rng.beta(0.6, 3.0, n_countries) * 0.6
+    headcount = np.clip(mpi / rng.uniform(0.33, 0.6, n_countries), 0, 1)
+    population = rng.lognormal(8, 1.5, n_countries)
+
+    dimensions = rng.dirichlet([2, 2, 3], n_countries) * 100
+    indicators = np.empty((n_countries, 10))
+    for i, (start, stop) in enumerate(INDICATOR_SPLITS):
+        indicators[:, start: stop] = dimensions[:, [i]] * rng.dirichlet(np.ones(stop - start), n_countries)
+
+    # standard errors of the MPI and headcount, the bounds are symmetric on the logit scale
+    se = mpi * rng.uniform(0.01, 0.5, n_countries)
+    headcount_se = headcount * rng.uniform(0.01, 0.5, n_countries)
+
+    national, contributions, uncertainty = [], [], []
+    for i in range(n_countries):
+        code, iso, country = 1000 + i, f"C{i:05d}", f"Country {i}"
+        region = REGIONS[i % len(REGIONS)]
+        survey, survey_year = ("DHS", "MICS")[i % 2], str(year - 1 - i % 5)
+
+        national.append([code, iso, country, region, survey, survey_year, mpi[i], headcount[i],
+                         mpi[i] / max(headcount[i], 1e-9) * 100, rng.uniform(0, 30), rng.uniform(0, 20),
+                         rng.uniform(0, 10), rng.uniform(0, 50), rng.uniform(0, 0.05), population[i] * 0.98,
+                         population[i] * 0.99, population[i], headcount[i] * population[i] * 0.98,
+                         headcount[i] * population[i] * 0.99, headcount[i] * population[i], 10, None])
+        contributions.append([code, iso, country, region, survey, survey_year, mpi[i], *dimensions[i],
+                              *indicators[i], 10, None])
+        uncertainty.append([code, iso, country, region, survey, survey_year, mpi[i], se[i], *_bounds(mpi[i], se[i]),
+                            headcount[i] * 100, headcount_se[i] * 100,
+                            *(bound * 100 for bound in _bounds(headcount[i], headcount_se[i])),
+                            mpi[i] / max(headcount[i], 1e-9) * 100, 10, None])
+
+    return {"1.1 National MPI Results": national, "1.3 Contribut'n of Deprivations": contributions,
+            "1.5 SEs & CIs": uncertainty}
+
+def write_workbook(path: str, year: int, n_countries: int, seed: int = 0):
+    """
+    Writes one synthetic workbook
+
+    Args:
+        path (str): Output path
+        year (int): Release year
+        n_countries (int): Number of countries (or subnational units)
+        seed (int): Seed of the random generator
+    """
+    workbook = Workbook(write_only= True)
+    for sheet_name, rows in country_rows(year, n_countries, seed).items():
+        sheet = workbook.create_sheet(sheet_name)
+        sheet.append([f"Table {sheet_name} (synthetic, {year})"])
+        for _ in range(3):
+            sheet.append([])
+        sheet.append([f"Column {i + 1}" for i in range(len(rows[0]))])
+        for _ in range(HEADER_ROWS - 5):
+            sheet.append([])
+        for row in rows:
+            sheet.append(row)
+        sheet.append([])
+        sheet.append(["Notes"])
+        for i in range(FOOTER_ROWS[sheet_name] - 2):
+            sheet.append([f"Note {i + 1}"])
+    workbook.save(path)
+
+def generate(root: str, years: list, n_countries: int, seed: int = 0) -> list[str]:
+    """
+    Writes one workbook per year under root/data/raw, named like the real releases, and
+    registers the schema of every year
+
+    Args:
+        root (str): Directory the pipeline is run from
+        years (list): Release years
+        n_countries (int): Number of countries (or subnational units) per release
+        seed (int): Seed of the random generator
+
+    Returns:
+        list[str]: Paths of the written workbooks
+    """
+    raw_dir = os.path.join(root, "data", "raw")
+    os.makedirs(raw_dir, exist_ok= True)
+
+    paths = []
+    for year in years:
+        path = os.path.join(raw_dir, f"Global MPI {year} National Results.xlsx")
+        write_workbook(path, year, n_countries, seed)
+        register(national_results_schema(year))
+        paths.append(path)
+    return paths
@@ -0,0 +1,99 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from columns import DIMENSIONS
+from data_cache import FRAME_CACHE
+from data_store import DATASET_DIR, atomic_write, open_dataset
+
+CUBE_PATH = "./data/processed/cube.parquet"
+
+def build_cube(dataset_dir: str = DATASET_DIR) -> pd.DataFrame:
+    """
+    Builds the region x year x dimension cube of headline values
+
+    The value of a dimension is the sum of its weighted column over the region's countries,
+    and the MPI is the sum of the three dimensions. Each row also carries the previous
+    year's value and the year over year change.
+
+    Args:
+        dataset_dir (str): Root directory of the dataset
+
+    Returns:
+        pd.DataFrame: Cube with Region, Year, Dimension, Value, Previous, Delta and Delta % columns
+    """
+    weighted_cols = [f"{dimension}_w" for dimension in DIMENSIONS]
+    table = open_dataset(dataset_dir).to_table(columns= ["region", "year"] + weighted_cols)
+    sums = table.to_pandas().groupby(["region", "year"])[weighted_cols].sum()
+    sums.columns = list(DIMENSIONS)
+    sums.insert(0, "MPI", sums.sum(axis= 1))
+
+    cube = sums.rename_axis(index= ["Region", "Year"], columns= "Dimension").stack().rename("Value").reset_index()
+    previous = cube.assign(Year= cube["Year"] + 1).rename(columns= {"Value": "Previous"})
+    cube = cube.merge(previous, on= ["Region", "Year", "Dimension"], how= "left")
+    cube["Delta"] = cube["Value"] - cube["Previous"]
+    cube["Delta %"] = cube["Delta"] / cube["Previous"] * 100
+
+    return cube.sort_values(["Region", "Year", "Dimension"], ignore_index= True)
+
+def write_cube(cube: pd.DataFrame, path: str = CUBE_PATH) -> str:
+    """
+    Writes the cube atomically
+
+    Args:
+        cube (pd.DataFrame): Cube created by build_cube
+        path (str): Output path
+
+    Returns:
+        str: Path of the written file
+    """
+    with atomic_write(path) as tmp_path:
+        pq.write_table(pa.Table.from_pandas(cube, preserve_index= False), tmp_path)
+    return path
+
+def load_cube(path: str = CUBE_PATH) -> pd.DataFrame:
+    """
+    Reads the cube through the process wide cache, indexed by (Region, Year, Dimension)
+
+    Args:
+        path (str): Path of the cube
+
+    Returns:
+        pd.DataFrame: Indexed cube
+    """
+    def loader() -> pd.DataFrame:
+        return pd.read_parquet(path).set_index(["Region", "Year", "Dimension"]).sort_index()
+
+    return FRAME_CACHE.load(("cube", os.path.abspath(path)), path, loader)
+
+def headline(cube: pd.DataFrame, key: str, year: int) -> pd.DataFrame:
+    """
+    Returns the headline values of a region and year
+
+    Args:
+        cube (pd.DataFrame): Indexed cube
+        key (str): Region key
+        year (int): Year
+
+    Returns:
+        pd.DataFrame: Value, Previous, Delta and Delta % indexed by Dimension
+    """
+    return cube.loc[(key, year)]
+
+def over_time(cube: pd.DataFrame, key: str, years: list) -> pd.DataFrame:
+    """
+    Returns the dimension values of a region for the available years
+
+    Args:
+        cube (pd.DataFrame): Indexed cube
+        key (str): Region key
+        years (list): Years to return, missing years are skipped
+
+    Returns:
+        pd.DataFrame: One row per year with a Year column and a column per dimension
+    """
+    values = cube.loc[key, "Value"].unstack("Dimension")
+    values = values.loc[values.index.intersection(years), list(DIMENSIONS)]
+    return values.sort_index(ascending= False).rename_axis(columns= None).reset_index()
@@ -0,0 +1,197 @@
+"""
+Serves the dashboard queries as a local JSON API
+
+Example:
+    python src/api.py --port 8502
+    curl "localhost:8502/headline?region=global,south_asia&year=2022,2023"
+
+Endpoints (GET, comma separated or repeated parameters):
+    /version                                       data version
+    /regions                                       region keys and their years
+    /headline?region=&year=                        headline metrics of every region and year
+    /interval?region=&year=                        confidence intervals of the MPI of every region and year
+    /trend?region=&year=                           dimension values over the years of every region
+    /top?region=&year=&dims=&order=&k=             top k countries of every region and year
+    /countries?country=&start=&end=                yearly values of several countries
+    /country?country=&year=                        metrics of every country and year
+
+POST /batch takes a JSON list of {"path": ..., "params": {...}} and answers them in one response.
+
+Responses carry an ETag derived from the data version and are cached until it changes, so
+conditional requests with If-None-Match are answered with 304 without running the query.
+"""
+import argparse
+import json
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import queries
+from columns import DIMENSIONS
+from data_cache import LRUCache
+from manifest import data_version
+
+# serialized responses, keyed by data version, path and parameters
+RESPONSE_CACHE = LRUCache(32 * 1024 ** 2, sizeof= len)
+
+# requests answered by a single /batch call
+MAX_BATCH = 1000
+
+ENDPOINTS = {"/version", "/regions", "/headline", "/interval", "/trend", "/top", "/countries", "/country"}
+
+# parameters whose values may contain commas, several values are passed as repeated parameters
+UNSPLIT = {"country"}
+
+def _list(params: dict, name: str, cast: type = str, default: list | None = None) -> list:
+    raw = params.get(name, [])
+    values = raw if name in UNSPLIT else [value for item in raw for value in item.split(",") if value]
+    if not values:
+        if default is None:
+            raise ValueError(f"missing parameter: {name}")
+        return default
+    try:
+        return [cast(value) for value in values]
+    except ValueError:
+        raise ValueError(f"invalid value for {name}: {values}") from None
+
+def _one(params: dict, name: str, cast: type = str, default= None):
+    values = _list(params, name, cast, [default])
+    return values[-1]
+
+def answer(path: str, params: dict):
+    """
+    Runs the query of an endpoint
+
+    Args:
+        path (str): Endpoint, e.g. "/headline"
+        params (dict): Parameters, each a list of values as returned by parse_qs
+
+    Returns:
+        Any: JSON serializable result
+
+    Raises:
+        KeyError: Unknown endpoint
+        ValueError: Missing or invalid parameters
+    """
+    if path == "/version":
+        return {"version": data_version()}
+    if path == "/regions":
+        return {key: queries.years(key) for key in queries.regions()}
+    if path == "/headline":
+        return queries.batch(queries.headline_metrics, _list(params, "region"), _list(params, "year", int))
+    if path == "/interval":
+        return queries.batch(queries.mpi_interval, _list(params, "region"), _list(params, "year", int))
+    if path == "/trend":
+        years = _list(params, "year", int, queries.years())
+        return [{"region": key, "result": queries.trend(key, years)} for key in _list(params, "region")]
+    if path == "/top":
+        return queries.batch(queries.top_countries, _list(params, "region"), _list(params, "year", int),
+                             dimensions= _list(params, "dims", default= list(DIMENSIONS)),
+                             order= _one(params, "order", default= "largest"), k= _one(params, "k", int, 5))
+    if path == "/countries":
+        return queries.country_trend(_list(params, "country"), _one(params, "start", int, None),
+                                     _one(params, "end", int, None))
+    if path == "/country":
+        return [{"country": country, "year": year, "result": queries.country_metrics(country, year)}
+                for country in _list(params, "country") for year in _list(params, "year", int)]
+    raise KeyError(f"unknown endpoint: {path}")
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    Request handler of the API, one thread per connection
+    """
+    protocol_version = "HTTP/1.1"
+    # keep-alive responses are written in two parts, don't let the second wait for an ack
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path not in ENDPOINTS:
+            self._error(HTTPStatus.NOT_FOUND, f"unknown endpoint: {url.path}")
+            return
+
+        params = parse_qs(url.query)
+        version = data_version()
+        etag = f'"{version[:32]}"'
+
+        if etag in self.headers.get("If-None-Match", "").split(", "):
+            self._send(HTTPStatus.NOT_MODIFIED, b"", etag)
+            return
+
+        cache_key = (version, url.path, tuple(sorted((name, tuple(values)) for name, values in params.items())))
+        body = RESPONSE_CACHE.get(cache_key)
+        if body is None:
+            try:
+                body = json.dumps(answer(url.path, params)).encode()
+            except ValueError as error:
+                self._error(HTTPStatus.BAD_REQUEST, str(error))
+                return
+            RESPONSE_CACHE.put(cache_key, body)
+        self._send(HTTPStatus.OK, body, etag)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != "/batch":
+            self._error(HTTPStatus.NOT_FOUND, f"unknown endpoint: {url.path}")
+            return
+
+        try:
+            requests = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            if not isinstance(requests, list) or len(requests) > MAX_BATCH:
+                raise ValueError(f"expected a list of at most {MAX_BATCH} requests")
+            results = []
+            for request in requests:
+                if "path" not in request:
+                    raise ValueError("every request needs a path")
+                params = {name: [str(value)] if not isinstance(value, list) else [str(v) for v in value]
+                          for name, value in request.get("params", {}).items()}
+                try:
+                    results.append({"result": answer(request["path"], params)})
+                except KeyError as error:
+                    results.append({"error": error.args[0]})
+                except ValueError as error:
+                    results.append({"error": str(error)})
+        except (ValueError, TypeError, AttributeError) as error:
+            self._error(HTTPStatus.BAD_REQUEST, str(error))
+            return
+        self._send(HTTPStatus.OK, json.dumps(results).encode(), f'"{data_version()[:32]}"')
+
+    def _error(self, status: HTTPStatus, message: str):
+        self._send(status, json.dumps({"error": message}).encode())
+
+    def _send(self, status: HTTPStatus, body: bytes, etag: str | None = None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args):
+        pass
+
+def serve(host: str = "127.0.0.1", port: int = 8502):
+    """
+    Serves the API until interrupted
+
+    Args:
+        host (str): Interface to listen on
+        port (int): Port to listen on
+    """
+    with ThreadingHTTPServer((host, port), Handler) as server:
+        server.daemon_threads = True
+        print(f"Serving the MPI API on http://{host}:{port}")
+        server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description= "Serves the dashboard queries as a JSON API")
+    parser.add_argument("--host", default= "127.0.0.1", help= "Interface to listen on")
+    parser.add_argument("--port", type= int, default= 8502, help= "Port to listen on")
+    args = parser.parse_args()
+    serve(args.host, args.port)
+
+if __name__ == "__main__":
+    main()
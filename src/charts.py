@@ -0,0 +1,159 @@
+import os
+import threading
+from contextlib import AbstractContextManager, nullcontext
+from typing import TYPE_CHECKING, Callable, Hashable
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from data_cache import LRUCache
+
+# plotly.express and pandas take most of a cold start, they are imported once a figure is
+# actually built rather than served from the cache
+if TYPE_CHECKING:
+    import pandas as pd
+
+# plotly imports its json engine on the first to_json and hands out the module while it is still
+# initializing, which breaks sessions building their first figures concurrently
+try:
+    import orjson  # noqa: F401
+except ImportError:
+    pass
+
+# plotly looks numpy and pandas up in sys.modules without taking the import lock, so a session
+# building or drawing a figure while another session imports them gets half initialized modules.
+# They are imported under this lock, and figures are built and drawn under it until then.
+_DATA_STACK_LOCK = threading.RLock()
+_data_stack_imported = threading.Event()
+
+def import_data_stack():
+    """
+    Imports numpy and pandas once per process, sessions call it before their first data module
+    """
+    if not _data_stack_imported.is_set():
+        with _DATA_STACK_LOCK:
+            import numpy  # noqa: F401
+            import pandas  # noqa: F401
+            _data_stack_imported.set()
+
+def plotting() -> AbstractContextManager:
+    """
+    Returns the context to build or draw figures in
+
+    Returns:
+        AbstractContextManager: The lock of import_data_stack until numpy and pandas are
+            imported, a no-op afterwards
+    """
+    return nullcontext() if _data_stack_imported.is_set() else _DATA_STACK_LOCK
+
+# plotting styles
+LEGEND = dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1)
+DIMENSION_COLORS = ["#c1b0b4", "#763028", "#2f4a5b"]
+
+# serialized figures shared by every session, keyed by the view state they were built for
+FIGURE_CACHE = LRUCache(int(os.environ.get("MPI_FIGURE_CACHE_BYTES", 64 * 1024 ** 2)), sizeof= len)
+
+def cached_figure(key: Hashable, builder: Callable[[], go.Figure]) -> go.Figure:
+    """
+    Returns the figure for a view state, building it only if it is not cached
+
+    The key must hold everything the figure depends on, including the data version.
+
+    Args:
+        key (Hashable): View state, e.g. ("distribution", region, year, data version)
+        builder (Callable[[], go.Figure]): Function building the figure
+
+    Returns:
+        go.Figure: Figure, a fresh copy on every call
+    """
+    figure_json = FIGURE_CACHE.get(key)
+    if figure_json is None:
+        import_data_stack()
+        figure_json = builder().to_json()
+        FIGURE_CACHE.put(key, figure_json)
+    with plotting():
+        return pio.from_json(figure_json)
+
+def distribution_chart(df: "pd.DataFrame") -> go.Figure:
+    """
+    Histogram of the MPI of every country
+
+    Args:
+        df (pd.DataFrame): Regional DataFrame
+
+    Returns:
+        go.Figure: Figure
+    """
+    import plotly.express as px
+
+    return px.histogram(df, x= "MPI", nbins= 20, color_discrete_sequence= ["#2f4a5b"])
+
+def trend_chart(df: "pd.DataFrame", y: list, colors: list) -> go.Figure:
+    """
+    Line chart of several columns over the years
+
+    Args:
+        df (pd.DataFrame): DataFrame with a Year column
+        y (list): Columns to draw
+        colors (list): Line colors
+
+    Returns:
+        go.Figure: Figure
+    """
+    import plotly.express as px
+
+    chart = px.line(df, x= "Year", y= y, color_discrete_sequence= colors, markers= True)
+    chart.update_layout(
+        xaxis = dict(
+            tickmode = 'array',
+            tickvals = df["Year"].unique()
+        ),
+        legend= LEGEND
+    )
+    return chart
+
+def comparison_trend_chart(df: "pd.DataFrame") -> go.Figure:
+    """
+    Line chart of the MPI of several countries over the years
+
+    Args:
+        df (pd.DataFrame): Country history with Year, Country and MPI columns
+
+    Returns:
+        go.Figure: Figure
+    """
+    import plotly.express as px
+
+    chart = px.line(df, x= "Year", y= "MPI", color= "Country", color_discrete_sequence = px.colors.qualitative.T10)
+    chart.update_layout(
+        xaxis = dict(
+            tickmode = 'array',
+            tickvals = df["Year"].unique()
+        ),
+        legend= LEGEND)
+    return chart
+
+def score_chart(df: "pd.DataFrame", x: list, colors: list, width: float = 0.6) -> go.Figure:
+    """
+    Stacked horizontal bar chart of the scores of several countries
+
+    Args:
+        df (pd.DataFrame): DataFrame with a Country column
+        x (list): Columns to stack
+        colors (list): Bar colors
+        width (float): Bar width
+
+    Returns:
+        go.Figure: Figure
+    """
+    import plotly.express as px
+
+    chart = px.bar(df, y= "Country", x= x, color_discrete_sequence= colors)
+    chart.update_layout(legend= LEGEND)
+    chart.update_traces(width= width)
+    return chart
@@ -0,0 +1,11 @@
+# indicator and dimension columns shared by the pipeline and the dashboard
+
+INDICATORS = ['Nutrition', 'Child Mortality', 'Years of Schooling',
+            'School Attendance', 'Cooking Fuel', 'Sanitation', 'Drinking Water',
+            'Electricity', 'Housing', 'Assets']
+
+DIMENSIONS = {
+    "Health": ['Nutrition', 'Child Mortality'],
+    "Education": ['Years of Schooling', 'School Attendance'],
+    "Living Standards": ['Cooking Fuel', 'Sanitation', 'Drinking Water', 'Electricity', 'Housing', 'Assets']
+}
@@ -0,0 +1,149 @@
+import pandas as pd
+
+from columns import DIMENSIONS, INDICATORS
+from data_cache import frame_nbytes
+
+# string columns stored as categorical codes
+CATEGORICAL = ["Country", "Region"]
+
+# columns computed from the indicators and population weights, in the order the pipeline writes them
+DERIVED = ([f"{col}_w" for col in INDICATORS] + list(DIMENSIONS)
+           + [f"{dimension}_w" for dimension in DIMENSIONS])
+
+# index written by DataFrame.to_csv, read back as a column
+CSV_INDEX = "Unnamed: 0"
+
+def base_columns(columns: list) -> list:
+    """
+    Returns the stored columns needed to compute the requested ones
+
+    Args:
+        columns (list): Requested columns, stored or derived
+
+    Returns:
+        list: Stored columns, in the order they are first needed
+    """
+    needed = []
+    for col in columns:
+        if col.endswith("_w") and col in DERIVED:
+            col = col[:-2]
+            needed.append("Weight")
+        needed.extend(DIMENSIONS.get(col, [col]))
+    return list(dict.fromkeys(needed))
+
+def derive(df: pd.DataFrame, col: str) -> pd.Series:
+    """
+    Computes one derived column from the stored ones
+
+    Args:
+        df (pd.DataFrame): Frame holding the indicators and, for weighted columns, the Weight column
+        col (str): Derived column, e.g. "Health_w"
+
+    Returns:
+        pd.Series: Derived column
+    """
+    weighted = col.endswith("_w")
+    name = col[:-2] if weighted else col
+    terms = [df[other] * df["Weight"] if weighted else df[other] for other in DIMENSIONS.get(name, [name])]
+
+    total = terms[0]
+    for term in terms[1:]:
+        total = total + term
+    return total.rename(col)
+
+def compact(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns the compact representation of a regional or yearly DataFrame
+
+    Country and Region become categorical, float columns are stored as float32 and the derived
+    and csv index columns are dropped, since they can be computed again on access.
+
+    Args:
+        df (pd.DataFrame): DataFrame created by the pipeline or read from its outputs
+
+    Returns:
+        pd.DataFrame: Compact DataFrame
+    """
+    df = df.drop(columns= [col for col in DERIVED + [CSV_INDEX] if col in df.columns])
+    dtypes = {col: "category" for col in CATEGORICAL if col in df.columns}
+    dtypes.update({col: "float32" for col, dtype in df.dtypes.items() if dtype == "float64"})
+    df = df.astype(dtypes)
+    return df.assign(**{col: df[col].cat.remove_unused_categories() for col in CATEGORICAL if col in df.columns})
+
+def expand(df: pd.DataFrame, columns: list | None = None) -> pd.DataFrame:
+    """
+    Returns the full representation of a compact DataFrame
+
+    Float32 columns are widened to float64, categorical columns decoded and the derived columns
+    computed from the widened values. Full DataFrames keep their dtypes.
+
+    Args:
+        df (pd.DataFrame): Compact or full DataFrame
+        columns (list | None): Columns to return, every stored and derived column if None
+
+    Returns:
+        pd.DataFrame: Full DataFrame
+    """
+    if columns is None:
+        derived = [col for col in DERIVED if col not in df.columns and set(base_columns([col])) <= set(df.columns)]
+        columns = list(df.columns) + derived
+
+    dtypes = {col: df[col].cat.categories.dtype for col in df.columns
+              if isinstance(df[col].dtype, pd.CategoricalDtype)}
+    dtypes.update({col: "float64" for col, dtype in df.dtypes.items() if dtype == "float32"})
+    if dtypes:
+        df = df.astype(dtypes)
+    return pd.DataFrame({col: df[col] if col in df.columns else derive(df, col) for col in columns},
+                        index= df.index)
+
+class CompactFrame:
+    """
+    Read only view of a compact DataFrame whose derived columns are computed when accessed
+
+    Supports the column access used by the dashboard: a single column returns a Series and a
+    list of columns a DataFrame. Derived columns are never stored, so every access computes
+    them again from the shared compact frame.
+
+    Args:
+        base (pd.DataFrame): Compact DataFrame created by compact()
+    """
+
+    def __init__(self, base: pd.DataFrame):
+        self.base = base
+
+    @property
+    def columns(self) -> list:
+        return list(self.base.columns) + [col for col in DERIVED
+                                          if set(base_columns([col])) <= set(self.base.columns)]
+
+    def __len__(self) -> int:
+        return len(self.base)
+
+    def __getitem__(self, key: str | list) -> pd.Series | pd.DataFrame:
+        if isinstance(key, str):
+            return self.base[key] if key in self.base.columns else derive(self.base, key)
+        return pd.DataFrame({col: self[col] for col in key}, index= self.base.index)
+
+    def memory_usage(self, index: bool = True, deep: bool = False) -> pd.Series:
+        return self.base.memory_usage(index= index, deep= deep)
+
+def memory_report(frames: list, columns: list | None = None) -> dict[str, float]:
+    """
+    Compares the memory of compact DataFrames with their full representation
+
+    Args:
+        frames (list): Compact DataFrames or CompactFrames
+        columns (list | None): Columns the full representation would hold, all if None
+
+    Returns:
+        dict[str, float]: Full, compact and saved size in bytes and the saved share in percent
+    """
+    full_bytes = compact_bytes = 0
+    for frame in frames:
+        base = frame.base if isinstance(frame, CompactFrame) else frame
+        compact_bytes += frame_nbytes(base)
+        full_bytes += frame_nbytes(expand(base, columns))
+
+    saved = full_bytes - compact_bytes
+    return {"full_bytes": full_bytes, "compact_bytes": compact_bytes, "saved_bytes": saved,
+            "saved_pct": saved / full_bytes * 100 if full_bytes else 0.0}
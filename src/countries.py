@@ -0,0 +1,78 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from columns import DIMENSIONS, INDICATORS
+from data_cache import FRAME_CACHE
+from data_store import DATASET_DIR, atomic_write, open_dataset
+
+COUNTRIES_PATH = "./data/processed/countries.parquet"
+
+def build_country_index(dataset_dir: str = DATASET_DIR) -> pd.DataFrame:
+    """
+    Builds the long format country x year table of unweighted values
+
+    Every country appears once per year in the global partitions, so those are the only
+    ones read.
+
+    Args:
+        dataset_dir (str): Root directory of the dataset
+
+    Returns:
+        pd.DataFrame: One row per country and year, sorted by Country and Year
+    """
+    columns = ["Country", "year", "Region", "MPI"] + INDICATORS + list(DIMENSIONS)
+    table = open_dataset(dataset_dir).to_table(columns= columns, filter= ds.field("region") == "global")
+    index = table.to_pandas().rename(columns= {"year": "Year"})
+    return index.sort_values(["Country", "Year"], ignore_index= True)
+
+def write_country_index(index: pd.DataFrame, path: str = COUNTRIES_PATH) -> str:
+    """
+    Writes the country index atomically
+
+    Args:
+        index (pd.DataFrame): Table created by build_country_index
+        path (str): Output path
+
+    Returns:
+        str: Path of the written file
+    """
+    with atomic_write(path) as tmp_path:
+        pq.write_table(pa.Table.from_pandas(index, preserve_index= False), tmp_path)
+    return path
+
+def load_country_index(path: str = COUNTRIES_PATH) -> pd.DataFrame:
+    """
+    Reads the country index through the process wide cache, indexed by (Country, Year)
+
+    Args:
+        path (str): Path of the country index
+
+    Returns:
+        pd.DataFrame: Indexed country table
+    """
+    def loader() -> pd.DataFrame:
+        return pd.read_parquet(path).set_index(["Country", "Year"]).sort_index()
+
+    return FRAME_CACHE.load(("countries", os.path.abspath(path)), path, loader)
+
+def country_history(index: pd.DataFrame, countries: list, start: int | None = None,
+                    end: int | None = None) -> pd.DataFrame:
+    """
+    Returns the yearly values of several countries in one indexed slice
+
+    Args:
+        index (pd.DataFrame): Indexed country table
+        countries (list): Country names, unknown names are skipped
+        start (int | None): First year, unbounded if None
+        end (int | None): Last year, unbounded if None
+
+    Returns:
+        pd.DataFrame: Rows of the countries within the year range, newest year first
+    """
+    countries = index.index.levels[0].intersection(countries)
+    history = index.loc[(countries, slice(start, end)), :].reset_index()
+    return history.sort_values(["Year", "Country"], ascending= [False, True], ignore_index= True)
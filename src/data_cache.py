@@ -0,0 +1,254 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Callable, Hashable
+
+# pandas is only needed to annotate, so processes serving cached values don't pay for importing it
+if TYPE_CHECKING:
+    import pandas as pd
+
+DEFAULT_MAX_BYTES = int(os.environ.get("MPI_CACHE_BYTES", 256 * 1024 ** 2))
+DEFAULT_REVALIDATE_AFTER = float(os.environ.get("MPI_CACHE_REVALIDATE", 2.0))
+
+def frame_nbytes(df: "pd.DataFrame") -> int:
+    """
+    Returns the memory used by a DataFrame, including object columns
+
+    Args:
+        df (pd.DataFrame): DataFrame to measure
+
+    Returns:
+        int: Size in bytes
+    """
+    return int(df.memory_usage(index= True, deep= True).sum())
+
+def file_signature(path: str) -> tuple[int, int] | None:
+    """
+    Returns a cheap signature of a file's state
+
+    Args:
+        path (str): File path
+
+    Returns:
+        tuple[int, int] | None: (mtime in ns, size) or None if the file is missing
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def file_digest(path: str) -> str | None:
+    """
+    Returns the content hash of a file
+
+    Every input and output of the pipeline is hashed by this function, so all hashes in the
+    manifest use the same algorithm.
+
+    Args:
+        path (str): File path
+
+    Returns:
+        str | None: Hex digest or None if the file is missing
+    """
+    digest = hashlib.blake2b()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+class LRUCache:
+    """
+    Thread safe least recently used cache bounded by the total size of its values
+
+    Args:
+        max_bytes (int): Total size the cached values may take up
+        sizeof (Callable[[Any], int]): Function returning the size of a value in bytes
+    """
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, sizeof: Callable[[Any], int] = frame_nbytes):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns a cached value and marks it as recently used
+
+        Args:
+            key (Hashable): Cache key
+            default (Any): Value returned when the key is not cached
+
+        Returns:
+            Any: Cached value or default
+        """
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+    def put(self, key: Hashable, value: Any):
+        """
+        Adds a value, evicting the least recently used entries to stay under max_bytes
+
+        Values larger than max_bytes are not cached.
+
+        Args:
+            key (Hashable): Cache key
+            value (Any): Value to cache
+        """
+        size = self.sizeof(value)
+        with self._lock:
+            self.pop(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last= False)
+                self.nbytes -= evicted_size
+
+    def pop(self, key: Hashable) -> Any:
+        """
+        Removes a value from the cache
+
+        Args:
+            key (Hashable): Cache key
+
+        Returns:
+            Any: Removed value or None if the key was not cached
+        """
+        with self._lock:
+            if key not in self._entries:
+                return None
+            value, size = self._entries.pop(key)
+            self.nbytes -= size
+            return value
+
+    def items(self) -> list[tuple[Hashable, Any]]:
+        """
+        Returns the cached keys and values, without marking them as used
+
+        Returns:
+            list[tuple[Hashable, Any]]: (key, value) pairs, least recently used first
+        """
+        with self._lock:
+            return [(key, value) for key, (value, _) in self._entries.items()]
+
+    def clear(self):
+        """
+        Removes every value from the cache
+        """
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+class FileCache(LRUCache):
+    """
+    LRU cache for values loaded from files, invalidated when the file changes
+
+    A file is checked at most once every revalidate_after seconds, so repeated reads
+    within that window do no I/O. When its mtime or size changes the file is hashed and
+    the value is only reloaded if the content actually differs. A file is only hashed once
+    its state changed, a value loaded for the first time costs a single read of the file.
+    Concurrent loads of the same key are shared, only one of them calls the loader.
+
+    Args:
+        max_bytes (int): Total size the cached values may take up
+        sizeof (Callable[[Any], int]): Function returning the size of a value in bytes
+        revalidate_after (float): Seconds between checks of a file's state
+    """
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, sizeof: Callable[[Any], int] = frame_nbytes,
+                 revalidate_after: float = DEFAULT_REVALIDATE_AFTER):
+        super().__init__(max_bytes, lambda entry: sizeof(entry["value"]))
+        self.revalidate_after = revalidate_after
+        self._loading: dict[Hashable, Future] = {}
+
+    def load(self, key: Hashable, path: str, loader: Callable[[], Any]) -> Any:
+        """
+        Returns the cached value for key, calling loader if it is missing or stale
+
+        Cached values are shared between sessions and must be treated as read only.
+
+        Args:
+            key (Hashable): Cache key
+            path (str): File the value is loaded from
+            loader (Callable[[], Any]): Function loading the value from path
+
+        Returns:
+            Any: Cached or freshly loaded value
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self.get(key)
+            stale = None
+            if entry is not None:
+                if now - entry["checked_at"] < self.revalidate_after:
+                    return entry["value"]
+
+                signature = file_signature(path)
+                if signature == entry["signature"]:
+                    entry["checked_at"] = now
+                    return entry["value"]
+                stale = entry, signature
+
+            future = self._loading.get(key)
+            loading = future is None
+            if loading:
+                future = self._loading[key] = Future()
+
+        if not loading:
+            return future.result()
+        try:
+            value = self._refresh(key, path, loader, now, stale)
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            with self._lock:
+                del self._loading[key]
+        return value
+
+    def _refresh(self, key: Hashable, path: str, loader: Callable[[], Any], now: float, stale: tuple | None) -> Any:
+        digest = None
+        if stale is not None:
+            # hashing reads the whole file, so it is only done once the file's state changed
+            entry, signature = stale
+            digest = file_digest(path)
+            if digest is not None and digest == entry["digest"]:
+                with self._lock:
+                    entry["signature"], entry["checked_at"] = signature, now
+                return entry["value"]
+
+        # the file state is taken before loading and checked again after, a file replaced
+        # while it was loaded may have been read in either state so its value is not cached
+        signature = file_signature(path)
+        value = loader()
+        if file_signature(path) == signature:
+            known = stale is not None and stale[1] == signature
+            self.put(key, {"value": value, "signature": signature, "digest": digest if known else None,
+                           "checked_at": now})
+        return value
+
+# shared by every session of the dashboard process
+FRAME_CACHE = FileCache()
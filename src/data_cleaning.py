@@ -1,112 +1,152 @@
+import argparse
 import os
+import numpy as np
 import pandas as pd
+from aggregates import CUBE_PATH, build_cube, write_cube
+from columns import DIMENSIONS, INDICATORS
+from compact import DERIVED, compact, expand, memory_report
+from countries import COUNTRIES_PATH, build_country_index, write_country_index
+from data_cache import file_digest
+from data_store import atomic_write, region_key, write_partition
+from ingest import CACHE_DIR, SheetSpec, read_sheets
+from manifest import (MANIFEST_PATH, artifacts_current, data_version, load_manifest, record_artifacts,
+                      record_year, save_manifest, stale_regions)
+from profiling import enable, stage, timed
+from rankings import RANKINGS_PATH, build_rankings, write_rankings
+from releases import is_current, publish_release
+from schemas import release_schema
+from snapshot import load_snapshot, write_snapshot
+from uncertainty import INTERVALS_PATH, build_intervals, write_intervals
 
-def merge(df1: pd.DataFrame, df2: pd.DataFrame, merge_on: str, check_col: str) -> pd.DataFrame:
-    """
-    
-    Merges df1 and df2
+YEARS = [2020, 2021, 2022, 2023]
+RAW_PATH = "./data/raw/Global MPI {year} National Results.xlsx"
+INTERM_DIR = "./data/interm"
+DERIVED_PATHS = [CUBE_PATH, RANKINGS_PATH, COUNTRIES_PATH, INTERVALS_PATH]
 
-    Args:
-        df1 (pd.DataFrame): First Excel Sheet
-        df2 (pd.DataFrame): Second Excel Sheet
-        merge_on (str): Column to merge on
-        check_col (str): Colum to check merge
+# tolerance of the values both sheets of a workbook report, see merge
+MERGE_RTOL = 1e-6
+MERGE_ATOL = 1e-9
 
-    Returns:
-        pd.DataFrame: Merged Excel Sheet
+class MergeMismatchError(ValueError):
     """
-    
-    df = pd.merge(left=df1, right= df2, how= "left", on= merge_on)
-    
-    if df[f"{check_col}_x"].equals(df[f"{check_col}_y"]):
-        return df
-    else:
-        return ValueError(f"Values in the '{check_col}' column do not match after the merge.")
+    Raised when the sheets of a workbook disagree after they are joined
 
-def standardize(df: pd.DataFrame, x: str):
+    Args:
+        message (str): Error message
+        mismatches (pd.DataFrame): Key, value of both sheets and difference of every
+            mismatching row, by row of the left sheet
     """
-    
-    This function will convert the indicator values from percents to values by\
-        multiplying the percents to the country's MPI
+    def __init__(self, message: str, mismatches: pd.DataFrame):
+        super().__init__(message)
+        self.mismatches = mismatches
 
-    Args:
-        df (pd.DataFrame): Original DataFrame
-        x (str): Column Name
+def key_positions(left: pd.Series, right: pd.Series) -> np.ndarray:
     """
-    df.loc[:, x] = df["MPI"] * df[x] / 100
+    Finds the row of every left key among the right keys
 
-def get_region_dict(regions: list, df: pd.DataFrame) -> dict:
-    """_summary_
+    Both key columns are hashed together in a single pass into shared integer codes, which
+    then index a code to row lookup table.
 
     Args:
-        regions (list): _description_
-        df (pd.DataFrame): _description_
+        left (pd.Series): Keys to look up
+        right (pd.Series): Keys of the indexed rows
 
     Returns:
-        dict: _description_
+        np.ndarray: Position in right of every left key, -1 where it is missing
+
+    Raises:
+        ValueError: A key appears more than once in right
     """
-    region_dict = {}
-    for region in regions:
-        region_df = df.loc[df["Region"] == region].drop(columns= "Region")
-        region_dict[region] = region_df
+    codes, uniques = pd.concat([right, left], ignore_index= True).factorize()
+    right_codes, left_codes = codes[:len(right)], codes[len(right):]
     
-    return region_dict
+    present = right_codes >= 0
+    counts = np.bincount(right_codes[present], minlength= len(uniques))
+    if (counts > 1).any():
+        duplicated = sorted(map(str, uniques[counts > 1]))
+        raise ValueError(f"Duplicated values in the '{right.name}' column: {', '.join(duplicated)}")
+    
+    # the extra last slot maps the -1 code of missing left keys to -1
+    rows = np.full(len(uniques) + 1, -1)
+    rows[right_codes[present]] = np.flatnonzero(present)
+    return rows[left_codes]
 
-def get_weights(df: pd.DataFrame, pop_col: str) -> pd.DataFrame:
+def merge(df1: pd.DataFrame, df2: pd.DataFrame, merge_on: str, check_col: str,
+          rtol: float = MERGE_RTOL, atol: float = MERGE_ATOL) -> pd.DataFrame:
     """
-    Returns DataFrame with population weight column
+    
+    Merges df1 and df2
+
+    Every row of df1 is matched to its row of df2 through the shared codes of their keys, and
+    the check column of both is compared for all rows at once. Identical columns are accepted
+    without computing any tolerance.
 
     Args:
-        df (pd.DataFrame): Original DataFrame
-        pop_col (str): Population Column Name
+        df1 (pd.DataFrame): First Excel Sheet
+        df2 (pd.DataFrame): Second Excel Sheet
+        merge_on (str): Column to merge on
+        check_col (str): Colum to check merge
+        rtol (float): Relative tolerance of the check
+        atol (float): Absolute tolerance of the check
 
     Returns:
-        pd.DataFrame: DataFrame column with weighted column
-    """
-    total_pop = df[pop_col].sum()
-    df.loc[:, "Weight"] = df[pop_col] / total_pop
-    return df
-
-def get_weighted_cols(df: pd.DataFrame):
-    """
-    Creates weighted indicator columns
+        pd.DataFrame: Merged Excel Sheet, with the rows of df1 and the columns of both, the
+            ones they share suffixed with "_x" and "_y"
 
-    Args:
-        df (pd.DataFrame): DataFrame to transform
+    Raises:
+        ValueError: A key appears more than once in df2
+        MergeMismatchError: Keys of df1 are missing from df2, or the check column differs
     """
+    positions = key_positions(df1[merge_on], df2[merge_on])
+    matched = positions >= 0
     
-    needs_weights = ['Nutrition', 'Child Mortality', 'Years of Schooling',
-            'School Attendance', 'Cooking Fuel', 'Sanitation', 'Drinking Water',
-            'Electricity', 'Housing', 'Assets']
+    left = df1[check_col].to_numpy(dtype= float)
+    right = np.where(matched, df2[check_col].to_numpy(dtype= float)[positions], np.nan)
     
-    for col in needs_weights:
-        col_name = col + "_w"
-        df.loc[:, col_name] = df[col] * df["Weight"]
+    if not (matched.all() and np.array_equal(left, right, equal_nan= True)):
+        ok = matched & np.isclose(left, right, rtol= rtol, atol= atol, equal_nan= True)
+        if not ok.all():
+            rows = np.flatnonzero(~ok)
+            mismatches = pd.DataFrame({merge_on: df1[merge_on].to_numpy()[rows], f"{check_col}_x": left[rows],
+                                       f"{check_col}_y": right[rows], "Difference": right[rows] - left[rows]},
+                                      index= df1.index[rows])
+            raise MergeMismatchError(
+                f"Values in the '{check_col}' column do not match after the merge for {len(rows)} of "
+                f"{len(df1)} rows ({(~matched).sum()} without a match):\n{mismatches.head(10).to_string()}",
+                mismatches)
     
+    shared = (set(df1.columns) & set(df2.columns)) - {merge_on}
+    left_df = df1.rename(columns= {col: f"{col}_x" for col in shared}).reset_index(drop= True)
+    right_df = (df2.drop(columns= merge_on).rename(columns= {col: f"{col}_y" for col in shared})
+                .iloc[positions].reset_index(drop= True))
+    return pd.concat([left_df, right_df], axis= 1)
 
-def get_hels(df: pd.DataFrame):
+def standardize(df: pd.DataFrame, x: str):
     """
-    Creates normal and weighted Health, Education, and Living Standards columns
+    
+    This function will convert the indicator values from percents to values by\
+        multiplying the percents to the country's MPI
 
     Args:
-        df (pd.DataFrame): DataFrame to transform
+        df (pd.DataFrame): Original DataFrame
+        x (str): Column Name
     """
-    df.loc[:, "Health"] = df["Nutrition"] + df["Child Mortality"]
-    df.loc[:, "Education"] = df["Years of Schooling"] + df["School Attendance"]
-    df.loc[:, "Living Standards"] = (df["Cooking Fuel"] + df["Sanitation"] + df["Drinking Water"]
-                                    + df["Electricity"] + df["Housing"] + df["Assets"])
-
-    df.loc[:, "Health_w"] = df["Nutrition_w"] + df["Child Mortality_w"]
-    df.loc[:, "Education_w"] = df["Years of Schooling_w"] + df["School Attendance_w"]
-    df.loc[:, "Living Standards_w"] = (df["Cooking Fuel_w"] + df["Sanitation_w"] + df["Drinking Water_w"]
-                                    + df["Electricity_w"] + df["Housing_w"] + df["Assets_w"])
+    df.loc[:, x] = df["MPI"] * df[x] / 100
 
-def gather_dfs(year: int | list) -> dict[int, pd.DataFrame]:
+def gather_dfs(year: int | list, workers: int | None = None, cache_dir: str | None = CACHE_DIR,
+               digests: dict[int, str] | None = None) -> dict[int, pd.DataFrame]:
     """
     Generates merged DataFrames for every year
 
+    Only the columns named by the schema of each release are read. The sheets of every
+    workbook are parsed in parallel and cached by content hash, so only new or changed
+    workbooks are parsed again.
+
     Args:
         year (int | list): Int or List of the year/s to gather
+        workers (int | None): Number of worker processes used to parse the sheets
+        cache_dir (str | None): Directory of the parsed sheet snapshots, None disables the cache
+        digests (dict[int, str] | None): Content hashes already taken of the workbooks, by year
     
     Returns:
         dict[int, pd.DataFrame]: Dictionary containing all merged DataFrames, with years as keys
@@ -117,94 +157,268 @@ def gather_dfs(year: int | list) -> dict[int, pd.DataFrame]:
     elif isinstance(year, list):
         years = year
     
+    years = list(dict.fromkeys(years))
+    schemas = [release_schema(year) for year in years]
+    specs = []
+    
+    for schema in schemas:
+        file_path = RAW_PATH.format(year= schema.year)
+        
+        if not os.path.exists(file_path):
+            raise ValueError(f"{file_path} file does not exist.")
+        
+        specs.append(SheetSpec(file_path, *schema.national))
+        specs.append(SheetSpec(file_path, *schema.contributions))
+        specs.append(SheetSpec(file_path, *schema.uncertainty))
+    
+    with stage("pipeline.read_excel", sheets= len(specs)):
+        sheets = read_sheets(specs, workers, cache_dir,
+                             {RAW_PATH.format(year= year): digest for year, digest in (digests or {}).items()})
     dfs = {}
-    checked = set()
     
-    for year in years:
-        if year not in checked:
-            file_path = f"./data/raw/Global MPI {year} National Results.xlsx"
-            
-            if os.path.exists(file_path):
-                
-                col1 = ["ISO Country Numeric Code", "ISO Country Code", "Country", "Region",
-                        "Survey", "Survey Year", "MPI", "Headcount", "Intensity", "Vulnerable to Poverty",
-                        "Severe Poverty", "Headcount Destitution", "MPI Poor Destitute", "Poor Variance",
-                        "Population YOS", f"Population {year - 3}", f"Population {year - 2}", "Poor YOS",
-                        f"Poor Population {year - 3}", f"Poor Population {year - 2}", "Total Indicators",
-                        "Indicator Missing"]
-                
-                col2 = ["ISO Country Numeric Code", "ISO Country Code", "Country", "Region", "Survey", "Year",
-                        "MPI", "Health", "Education", "Living Standards", "Nutrition", "Child Mortality", "Years of Schooling",
-                        "School Attendance", "Cooking Fuel", "Sanitation", "Drinking Water", "Electricity", "Housing",
-                        "Assets", "Total Indicators", "Missing Indicators"]
-                
-                df_1 = pd.read_excel(file_path,
-                        sheet_name= "1.1 National MPI Results",
-                        skiprows=8, skipfooter=10, names = col1)
-                df_2 = pd.read_excel(file_path,
-                                sheet_name= "1.3 Contribut'n of Deprivations",
-                                skiprows=8, skipfooter=3, names= col2)
-                
-                df = merge(df_1.fillna(0), df_2.fillna(0), "ISO Country Code", "MPI") 
-                df = df[["Country_x", 'MPI_x',
-                    'Intensity', f'Population {year- 2}', "Region_y", 'Nutrition', 'Child Mortality',
-                    'Years of Schooling', 'School Attendance', 'Cooking Fuel',
-                    'Sanitation', 'Drinking Water', 'Electricity', 'Housing', 'Assets']]
-                
-                df = df.rename(columns={"Country_x": "Country", "MPI_x": "MPI", "Region_y": "Region"})
-                
-                indicator_list = ['Nutrition', 'Child Mortality',
-                'Years of Schooling', 'School Attendance', 'Cooking Fuel',
-                'Sanitation', 'Drinking Water', 'Electricity', 'Housing', 'Assets']
-                
-                for x in indicator_list:
-                    standardize(df, x)
-                    
-                dfs[year] = df
-                checked.add(year)
+    for i, schema in enumerate(schemas):
+        year = schema.year
+        df_1, df_2, df_3 = (sheet.fillna(0) for sheet in sheets[3 * i: 3 * i + 3])
+        
+        with stage("pipeline.merge", year= year):
+            df = merge(df_1, df_2, "ISO Country Code", "MPI")
+            # both merges keep the rows of the national sheet in order
+            df["MPI SE"] = merge(df_1, df_3, "ISO Country Code", "MPI")["MPI SE"]
+        df = df[["Country", "MPI_x", "MPI SE", "Intensity", schema.population, "Region"] + INDICATORS]
+        df = df.rename(columns={"MPI_x": "MPI"})
+        
+        with stage("pipeline.standardize", year= year):
+            for x in INDICATORS:
+                standardize(df, x)
             
-            else:
-                raise ValueError(f"{file_path} file does not exist.")
+        dfs[year] = df
             
     return dfs
 
-def get_regionals(year: int | list, year_dict: dict):
+def group_totals(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """
+    Sums contiguous groups of values
+
+    Each group is summed with the same pairwise summation as Series.sum, so the totals
+    match the per-region sums bit for bit.
+
+    Args:
+        values (np.ndarray): Values sorted by group
+        starts (np.ndarray): Index of the first value of every group
+
+    Returns:
+        np.ndarray: Total of every group
+    """
+    return np.array([segment.sum() for segment in np.split(values, starts[1:])])
+
+@timed("pipeline.get_regionals")
+def get_regionals(year: int | list, year_dict: dict, compact_mode: bool = False) -> dict[tuple[str, int], pd.DataFrame]:
     """
-    Creates csv files of regional information
+    Creates DataFrames of regional information
+
+    Every year is stacked into one frame, with each country appearing once in its own region
+    and once in "Global". Population weights, the weighted indicator columns and the Health,
+    Education and Living Standards rollups are then computed for all regions and years at once.
+    In compact mode only the weights are computed and the regional DataFrames are compacted,
+    the other derived columns are computed when the DataFrames are written.
 
     Args:
         year (int | list): Int or List of the year/s to gather
         year_dict (dict): Dictionary containing all the DataFrames
+        compact_mode (bool): Return compact DataFrames, see compact.compact
+
+    Returns:
+        dict[tuple[str, int], pd.DataFrame]: Regional DataFrames, with (region, year) as keys
     """
     if isinstance(year, int):
         years = [year]
     elif isinstance(year, list):
         years = year
-    checked = set()
+    years = list(dict.fromkeys(years))
+    
+    stacked = pd.concat([year_dict[year].rename(columns= {f"Population {year - 2}": "Population"})
+                         .assign(Year= year) for year in years])
+    grouped = pd.concat([stacked.assign(Group= stacked["Region"]), stacked.assign(Group= "Global")])
+    grouped = grouped.sort_values(["Year", "Group"], kind= "stable")
+    
+    group_keys = grouped[["Year", "Group"]].to_numpy()
+    starts = np.flatnonzero(np.r_[True, (group_keys[1:] != group_keys[:-1]).any(axis= 1)])
+    sizes = np.diff(np.r_[starts, len(grouped)])
     
+    population = grouped["Population"].to_numpy(dtype= float)
+    weight = population / np.repeat(group_totals(population, starts), sizes)
+    
+    derived = {"Weight": weight}
+    if not compact_mode:
+        indicators = grouped[INDICATORS].to_numpy(dtype= float)
+        weighted = indicators * weight[:, None]
+        
+        derived.update({f"{col}_w": weighted[:, i] for i, col in enumerate(INDICATORS)})
+        for suffix, matrix in (("", indicators), ("_w", weighted)):
+            for dimension, cols in DIMENSIONS.items():
+                total = matrix[:, INDICATORS.index(cols[0])]
+                for col in cols[1:]:
+                    total = total + matrix[:, INDICATORS.index(col)]
+                derived[dimension + suffix] = total
+    
+    grouped = pd.concat([grouped, pd.DataFrame(derived, index= grouped.index)], axis= 1)
+    
+    bounds = {(year, group): (start, start + size)
+              for (year, group), start, size in zip(group_keys[starts], starts, sizes)}
+    
+    regionals = {}
     for year in years:
-        if year not in checked:
+        regions = list(year_dict[year]["Region"].unique()) + ["Global"]
+        for region in regions:
+            start, stop = bounds[(year, region)]
+            region_df = grouped.iloc[start: stop]
+            region_df = region_df.drop(columns= ["Year", "Group"] + ([] if region == "Global" else ["Region"]))
+            region_df = region_df.rename(columns= {"Population": f"Population {year - 2}"})
             
-            full_df = year_dict[year]
-            regions = list(full_df["Region"].unique())
-            region_dict = get_region_dict(regions, full_df)
-            region_dict["Global"] = full_df
-                
-            for region in region_dict.keys():
-                var_name = region.lower().replace(" ", "_").replace("-", "_") + f"_{year}"
-                region_df = get_weights(region_dict[region], f"Population {year - 2}")
-                
-                get_weighted_cols(region_df)
-                get_hels(region_df)
-                
-                output_filepath = f"./data/interm/{var_name}.csv"
-                region_df.to_csv(output_filepath)
+            # stacking the years can widen dtypes, restore the ones of the year's frame
+            widened = {col: dtype for col, dtype in year_dict[year].dtypes.items()
+                       if col in region_df.columns and region_df[col].dtype != dtype}
+            region_df = region_df.astype(widened) if widened else region_df
+            regionals[(region, year)] = compact(region_df) if compact_mode else region_df
+    
+    return regionals
+
+def write_regionals(regionals: dict[tuple[str, int], pd.DataFrame]) -> dict[int, dict[str, dict[str, str]]]:
+    """
+    Writes the regional csv files and dataset partitions, each replaced atomically
+
+    Compact DataFrames are expanded one at a time, so the files always hold every column.
+
+    Args:
+        regionals (dict[tuple[str, int], pd.DataFrame]): Regional DataFrames, with (region, year) as keys
+
+    Returns:
+        dict[int, dict[str, dict[str, str]]]: Hashes of the written files, by year and region
+    """
+    written = {}
+    for (region, year), region_df in regionals.items():
+        if not set(DERIVED) <= set(region_df.columns):
+            region_df = expand(region_df)
+        csv_path = f"{INTERM_DIR}/{region_key(region)}_{year}.csv"
+        with stage("pipeline.to_csv", region= region, year= year), atomic_write(csv_path) as tmp_path:
+            region_df.to_csv(tmp_path)
+        with stage("pipeline.to_parquet", region= region, year= year):
+            parquet_path = write_partition(region_df, region, year)
+        
+        written.setdefault(year, {})[region] = {path: file_digest(path) for path in (csv_path, parquet_path)}
+    
+    return written
+
+def write_derived() -> dict[str, str]:
+    """
+    Writes the artifacts derived from the whole dataset, each replaced atomically
+
+    Returns:
+        dict[str, str]: Hashes of the written files, by path
+    """
+    paths = []
+    with stage("pipeline.cube"):
+        paths.append(write_cube(build_cube()))
+    with stage("pipeline.rankings"):
+        paths.append(write_rankings(build_rankings()))
+    with stage("pipeline.countries"):
+        paths.append(write_country_index(build_country_index()))
+    with stage("pipeline.intervals"):
+        paths.append(write_intervals(build_intervals()))
+    return {path: file_digest(path) for path in paths}
+
+@timed("pipeline.build")
+def build(years: list, force: bool = False, workers: int | None = None,
+          compact_mode: bool = False) -> list[tuple[str, int]]:
+    """
+    Rebuilds the regional outputs whose inputs changed since the last build
+
+    Workbooks are compared with the hashes in the build manifest. Years whose workbook is
+    unchanged are not read at all unless one of their outputs is missing or modified, or was
+    written in the other compact mode. The derived artifacts are rewritten whenever a regional output was, and the dataset is published
+    as a new memory mapped release whenever the manifest changed, along with the snapshot of
+    the dashboard's default view.
+
+    Args:
+        years (list): Years to build
+        force (bool): Rebuild every output regardless of the manifest
+        workers (int | None): Number of worker processes used to parse the sheets
+        compact_mode (bool): Hold the intermediate DataFrames in their compact form and print
+            the memory it saved
 
+    Returns:
+        list[tuple[str, int]]: (region, year) outputs that were rebuilt
+    """
+    manifest = load_manifest()
+    digests = {}
+    stale = {}
+    
+    for year in years:
+        file_path = RAW_PATH.format(year= year)
+        if not os.path.exists(file_path):
+            raise ValueError(f"{file_path} file does not exist.")
+        
+        digests[year] = file_digest(file_path)
+        regions = None if force else stale_regions(manifest, year, digests[year], compact_mode)
+        if regions is None or regions:
+            stale[year] = regions
+    
+    regionals = {}
+    if stale:
+        year_dfs = gather_dfs(list(stale), workers, digests= digests)
+        if compact_mode:
+            year_dfs = {year: compact(df) for year, df in year_dfs.items()}
+        regionals = get_regionals(list(stale), year_dfs, compact_mode)
+        regionals = {(region, year): df for (region, year), df in regionals.items()
+                     if stale[year] is None or region in stale[year]}
+        
+        if compact_mode:
+            report = memory_report(list(regionals.values()))
+            print(f"Compact frames: {report['compact_bytes'] / 1024 ** 2:.2f} MiB instead of "
+                  f"{report['full_bytes'] / 1024 ** 2:.2f} MiB ({report['saved_pct']:.0f}% saved)")
+        
+        for year, outputs in write_regionals(regionals).items():
+            if stale[year] is None:
+                manifest["years"].pop(str(year), None)
+            record_year(manifest, year, RAW_PATH.format(year= year), digests[year], outputs, compact_mode)
+    
+    if regionals or force or not artifacts_current(manifest, DERIVED_PATHS, compact_mode):
+        record_artifacts(manifest, write_derived(), compact_mode)
+        save_manifest(manifest)
+    
+    publish()
+    return list(regionals)
+
+def publish():
+    """
+    Publishes the dataset as a release and writes the snapshot of the dashboard's default view,
+    unless both are current with the manifest
+    """
+    version = file_digest(MANIFEST_PATH)[:16]
+    if not is_current(version):
+        with stage("pipeline.release"):
+            publish_release(version)
+    
+    # the dashboard draws its default view from this snapshot until a selection changes
+    if load_snapshot(data_version()) is None:
+        with stage("pipeline.snapshot"):
+            write_snapshot(data_version())
 
 def main():
-    YEARS = [2020, 2021, 2022, 2023]
-    year_dfs = gather_dfs(YEARS)
-    get_regionals(YEARS, year_dfs)
+    parser = argparse.ArgumentParser(description= "Builds the regional MPI outputs from the raw workbooks")
+    parser.add_argument("--years", type= int, nargs= "+", default= YEARS, help= "Years to build")
+    parser.add_argument("--force", action= "store_true", help= "Rebuild every output, ignoring the manifest")
+    parser.add_argument("--workers", type= int, default= None, help= "Worker processes used to parse the workbooks")
+    parser.add_argument("--compact", action= "store_true",
+                        help= "Hold the intermediate frames as categorical/float32 without derived columns")
+    parser.add_argument("--profile", nargs= "?", const= "./logs/timings.jsonl", default= None,
+                        help= "Append stage timings and memory to this JSON lines file")
+    args = parser.parse_args()
+    
+    if args.profile:
+        enable(args.profile, memory= True)
+    rebuilt = build(args.years, args.force, args.workers, args.compact)
+    print(f"Rebuilt {len(rebuilt)} regional output(s)" if rebuilt else "Regional outputs are up to date")
     
 
 if __name__ == "__main__":
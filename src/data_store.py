@@ -0,0 +1,147 @@
+import os
+from contextlib import contextmanager
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from compact import CompactFrame, base_columns, compact
+from data_cache import FRAME_CACHE
+
+DATASET_DIR = "./data/processed/mpi"
+
+# hive style partitions: region=<key>/year=<year>/part-0.parquet
+PARTITIONING = ds.partitioning(
+    pa.schema([("region", pa.string()), ("year", pa.int32())]), flavor= "hive")
+
+@contextmanager
+def atomic_write(path: str):
+    """
+    Yields a temporary path that replaces path once the block completes
+
+    Readers never see a partially written file. The temporary file is hidden (dot prefix)
+    so dataset discovery skips it, and it is removed if writing fails.
+
+    Args:
+        path (str): Final path of the file
+    """
+    directory, name = os.path.split(path)
+    os.makedirs(directory, exist_ok= True)
+    tmp_path = os.path.join(directory, f".{name}.{os.getpid()}.tmp")
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def region_key(region: str) -> str:
+    """
+    Converts a region name to the key used in file and partition names
+
+    Args:
+        region (str): Region name, e.g. "Sub-Saharan Africa"
+
+    Returns:
+        str: Region key, e.g. "sub_saharan_africa"
+    """
+    return region.lower().replace(" ", "_").replace("-", "_")
+
+def partition_path(key: str, year: int, dataset_dir: str = DATASET_DIR) -> str:
+    """
+    Returns the file path of a single (region, year) partition
+
+    Args:
+        key (str): Region key
+        year (int): Year of the partition
+        dataset_dir (str): Root directory of the dataset
+
+    Returns:
+        str: Path to the partition's parquet file
+    """
+    return os.path.join(dataset_dir, f"region={key}", f"year={year}", "part-0.parquet")
+
+def write_partition(df: pd.DataFrame, region: str, year: int, dataset_dir: str = DATASET_DIR) -> str:
+    """
+    Writes one regional DataFrame to its partition of the dataset, replacing it atomically
+
+    The year specific population column is stored as "Population" so every partition
+    shares the same schema.
+
+    Args:
+        df (pd.DataFrame): Regional DataFrame created by the pipeline
+        region (str): Region name
+        year (int): Year of the data
+        dataset_dir (str): Root directory of the dataset
+
+    Returns:
+        str: Path of the written file
+    """
+    df = df.rename(columns= {f"Population {year - 2}": "Population"})
+    if "Region" not in df.columns:
+        df = df.assign(Region= region)
+
+    path = partition_path(region_key(region), year, dataset_dir)
+    with atomic_write(path) as tmp_path:
+        pq.write_table(pa.Table.from_pandas(df, preserve_index= False), tmp_path)
+    return path
+
+def open_dataset(dataset_dir: str = DATASET_DIR) -> ds.Dataset:
+    """
+    Opens the partitioned dataset without reading any data
+
+    Args:
+        dataset_dir (str): Root directory of the dataset
+
+    Returns:
+        ds.Dataset: Arrow dataset
+    """
+    return ds.dataset(dataset_dir, format= "parquet", partitioning= PARTITIONING)
+
+def load_frame(key: str, year: int, columns: list | None = None,
+               dataset_dir: str = DATASET_DIR) -> pd.DataFrame:
+    """
+    Reads one (region, year) slice of the dataset
+
+    Only the partition matching the region and year is opened and only the requested
+    columns are decoded.
+
+    Args:
+        key (str): Region key, e.g. "global"
+        year (int): Year to read
+        columns (list | None): Columns to read, all columns if None
+        dataset_dir (str): Root directory of the dataset
+
+    Returns:
+        pd.DataFrame: Matching rows, empty if the partition does not exist
+    """
+    dataset = open_dataset(dataset_dir)
+    row_filter = (ds.field("region") == key) & (ds.field("year") == year)
+    return dataset.to_table(columns= columns, filter= row_filter).to_pandas()
+
+def cached_frame(key: str, year: int, columns: list | None = None,
+                 dataset_dir: str = DATASET_DIR, compact_mode: bool = False) -> pd.DataFrame | CompactFrame:
+    """
+    Reads one (region, year) slice of the dataset through the process wide cache
+
+    The returned DataFrame is shared by every session and must not be modified in place.
+    In compact mode only the stored columns the requested ones depend on are read and cached
+    in their compact form, the derived columns are computed whenever they are accessed.
+
+    Args:
+        key (str): Region key, e.g. "global"
+        year (int): Year to read
+        columns (list | None): Columns to read, all columns if None
+        dataset_dir (str): Root directory of the dataset
+        compact_mode (bool): Return a CompactFrame, see compact.compact
+
+    Returns:
+        pd.DataFrame | CompactFrame: Matching rows, empty if the partition does not exist
+    """
+    cache_key = (os.path.abspath(dataset_dir), key, year, tuple(columns) if columns else None, compact_mode)
+    def loader() -> pd.DataFrame | CompactFrame:
+        if not compact_mode:
+            return load_frame(key, year, columns, dataset_dir)
+        return CompactFrame(compact(load_frame(key, year, columns and base_columns(columns), dataset_dir)))
+
+    return FRAME_CACHE.load(cache_key, partition_path(key, year, dataset_dir), loader)
@@ -0,0 +1,233 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from columns import DIMENSIONS, INDICATORS
+from data_store import atomic_write
+from profiling import enable, stage, timed
+from releases import RELEASES_DIR, current_release
+
+EXPORT_DIR = "./data/export"
+FORMATS = ("csv", "parquet", "xlsx")
+
+# codecs of the csv and parquet files, workbooks are always zip compressed
+COMPRESSIONS = ("gzip", "zstd", "none")
+CSV_SUFFIXES = {"gzip": ".csv.gz", "zstd": ".csv.zst", "none": ".csv"}
+
+def export_path(fmt: str, key: str, year: int, compression: str = "gzip", export_dir: str = EXPORT_DIR) -> str:
+    """
+    Returns the path of one exported file
+
+    Args:
+        fmt (str): Format, one of FORMATS
+        key (str): Region key, e.g. "global"
+        year (int): Year
+        compression (str): Codec of the csv and parquet files, one of COMPRESSIONS
+        export_dir (str): Root directory of the exports
+
+    Returns:
+        str: Path of the file, e.g. ./data/export/csv/global_2023.csv.gz
+    """
+    suffix = CSV_SUFFIXES[compression] if fmt == "csv" else f".{fmt}"
+    return os.path.join(export_dir, fmt, f"{key}_{year}{suffix}")
+
+def release_partitions(regions: list | None = None, years: list | None = None,
+                       releases_dir: str = RELEASES_DIR) -> dict[tuple[str, int], pa.RecordBatch]:
+    """
+    Returns the record batches of the current release, one per region and year
+
+    The batches are views of the mapped release, nothing is copied until a writer encodes them.
+
+    Args:
+        regions (list | None): Region keys to return, all regions if None
+        years (list | None): Years to return, all years if None
+        releases_dir (str): Directory of the releases
+
+    Returns:
+        dict[tuple[str, int], pa.RecordBatch]: Batches keyed by (region key, year)
+
+    Raises:
+        ValueError: No release was published, or no partition matches
+    """
+    release = current_release(releases_dir)
+    if release is None:
+        raise ValueError(f"No release in {releases_dir}, run src/data_cleaning.py first.")
+
+    reader, partitions = release
+    batches = {}
+    for name, index in partitions.items():
+        key, year = name.rsplit("/", 1)
+        if (regions is None or key in regions) and (years is None or int(year) in years):
+            batches[(key, int(year))] = reader.get_batch(index)
+    if not batches:
+        raise ValueError(f"The release has no partition for regions {regions} and years {years}.")
+    return batches
+
+def write_csv(batch: pa.RecordBatch, path: str, compression: str = "gzip") -> str:
+    """
+    Writes a batch as csv without an index column, replacing the file atomically
+
+    Args:
+        batch (pa.RecordBatch): Rows of one region and year
+        path (str): Output path
+        compression (str): Codec of the file, one of COMPRESSIONS
+
+    Returns:
+        str: Path of the written file
+    """
+    with atomic_write(path) as tmp_path:
+        if compression == "none":
+            pa_csv.write_csv(batch, tmp_path)
+        else:
+            with pa.CompressedOutputStream(tmp_path, compression) as sink:
+                pa_csv.write_csv(batch, sink)
+    return path
+
+def write_parquet(batch: pa.RecordBatch, path: str, compression: str = "gzip") -> str:
+    """
+    Writes a batch as parquet, replacing the file atomically
+
+    Args:
+        batch (pa.RecordBatch): Rows of one region and year
+        path (str): Output path
+        compression (str): Codec of the file, one of COMPRESSIONS
+
+    Returns:
+        str: Path of the written file
+    """
+    with atomic_write(path) as tmp_path:
+        pq.write_table(pa.Table.from_batches([batch]), tmp_path, compression= None if compression == "none" else compression)
+    return path
+
+def summary_rows(batch: pa.RecordBatch, key: str, year: int) -> list[tuple]:
+    """
+    Computes the regional values of a batch, the population weighted sums of its countries
+
+    Args:
+        batch (pa.RecordBatch): Rows of one region and year
+        key (str): Region key
+        year (int): Year
+
+    Returns:
+        list[tuple]: (label, value) rows
+    """
+    def weighted(col: str) -> float:
+        return pc.sum(batch[f"{col}_w"]).as_py() or 0.0
+
+    rows = [("Region", key), ("Year", year), ("Countries", batch.num_rows),
+            ("Population", pc.sum(batch["Population"]).as_py() or 0.0),
+            ("MPI", pc.sum(pc.multiply(batch["MPI"], batch["Weight"])).as_py() or 0.0)]
+    rows.extend((dimension, weighted(dimension)) for dimension in DIMENSIONS)
+    rows.extend((indicator, weighted(indicator)) for indicator in INDICATORS)
+    return rows
+
+def write_xlsx(batch: pa.RecordBatch, path: str, key: str, year: int) -> str:
+    """
+    Writes the report workbook of a region and year, replacing the file atomically
+
+    The workbook has a Summary sheet with the regional values and a Countries sheet with
+    every row of the batch.
+
+    Args:
+        batch (pa.RecordBatch): Rows of one region and year
+        path (str): Output path
+        key (str): Region key
+        year (int): Year
+
+    Returns:
+        str: Path of the written file
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only= True)
+    summary = workbook.create_sheet("Summary")
+    summary.append(["Field", "Value"])
+    for row in summary_rows(batch, key, year):
+        summary.append(list(row))
+
+    countries = workbook.create_sheet("Countries")
+    countries.append(batch.schema.names)
+    for row in zip(*(column.to_pylist() for column in batch.columns)):
+        countries.append(list(row))
+
+    with atomic_write(path) as tmp_path:
+        workbook.save(tmp_path)
+    return path
+
+def _write(fmt: str, batch: pa.RecordBatch, key: str, year: int, compression: str, export_dir: str) -> str:
+    path = export_path(fmt, key, year, compression, export_dir)
+    with stage(f"export.{fmt}", region= key, year= year):
+        if fmt == "csv":
+            return write_csv(batch, path, compression)
+        if fmt == "parquet":
+            return write_parquet(batch, path, compression)
+        return write_xlsx(batch, path, key, year)
+
+@timed("export.run")
+def export(formats: list = FORMATS, regions: list | None = None, years: list | None = None,
+           compression: str = "gzip", workers: int | None = None, export_dir: str = EXPORT_DIR,
+           releases_dir: str = RELEASES_DIR) -> list[str]:
+    """
+    Exports every region and year of the current release in the requested formats
+
+    Every partition is read once from the mapped release and all of its files are written
+    from that batch concurrently. Arrow encodes and compresses the csv and parquet files
+    without holding the GIL, so they are written by a thread pool, while the workbooks, built
+    cell by cell in Python, are written by worker processes.
+
+    Args:
+        formats (list): Formats to write, see FORMATS
+        regions (list | None): Region keys to export, all regions if None
+        years (list | None): Years to export, all years if None
+        compression (str): Codec of the csv and parquet files, one of COMPRESSIONS
+        workers (int | None): Number of threads and of worker processes, one per CPU if None,
+            everything is written by a single thread if 1
+        export_dir (str): Root directory of the exports
+        releases_dir (str): Directory of the releases
+
+    Returns:
+        list[str]: Paths of the written files
+
+    Raises:
+        ValueError: Unknown format or compression, see also release_partitions
+    """
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown formats {sorted(unknown)}, expected some of {FORMATS}.")
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression {compression}, expected one of {COMPRESSIONS}.")
+
+    jobs = [(fmt, batch, key, year, compression, export_dir)
+            for (key, year), batch in release_partitions(regions, years, releases_dir).items() for fmt in formats]
+    workbook_pool = workers != 1 and sum(job[0] == "xlsx" for job in jobs) > 1
+    with ThreadPoolExecutor(workers or os.cpu_count()) as threads, \
+            (ProcessPoolExecutor(max_workers= workers) if workbook_pool else nullcontext(threads)) as processes:
+        futures = [(processes if job[0] == "xlsx" else threads).submit(_write, *job) for job in jobs]
+        return [future.result() for future in futures]
+
+def main():
+    parser = argparse.ArgumentParser(description= "Exports the regional MPI outputs as csv, parquet and Excel files")
+    parser.add_argument("--formats", nargs= "+", choices= FORMATS, default= list(FORMATS), help= "Formats to write")
+    parser.add_argument("--regions", nargs= "+", default= None, help= "Region keys to export, e.g. global")
+    parser.add_argument("--years", type= int, nargs= "+", default= None, help= "Years to export")
+    parser.add_argument("--compression", choices= COMPRESSIONS, default= "gzip",
+                        help= "Codec of the csv and parquet files")
+    parser.add_argument("--workers", type= int, default= None, help= "Threads and worker processes writing the files")
+    parser.add_argument("--export-dir", default= EXPORT_DIR, help= "Root directory of the exports")
+    parser.add_argument("--profile", nargs= "?", const= "./logs/timings.jsonl", default= None,
+                        help= "Append stage timings and memory to this JSON lines file")
+    args = parser.parse_args()
+
+    if args.profile:
+        enable(args.profile, memory= True)
+    written = export(args.formats, args.regions, args.years, args.compression, args.workers, args.export_dir)
+    print(f"Exported {len(written)} file(s) to {args.export_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterator, NamedTuple
+
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.utils import column_index_from_string
+
+from data_cache import file_digest
+from data_store import atomic_write
+
+CACHE_DIR = "./data/cache/sheets"
+
+# bump whenever a change to the parsing changes the parsed sheets, so old snapshots are not reused
+PARSER_VERSION = "1"
+
+class SheetSpec(NamedTuple):
+    """
+    Describes one sheet of an MPI workbook to parse
+
+    Args:
+        file_path (str): Path of the workbook
+        sheet_name (str): Name of the sheet
+        header_rows (int): Rows above the first data row
+        columns (dict[str, str]): Column names by Excel column letter, only these columns are
+            read and the table ends at the first row whose first column is empty
+    """
+    file_path: str
+    sheet_name: str
+    header_rows: int
+    columns: dict[str, str]
+
+def sheet_cache_path(spec: SheetSpec, digest: str, cache_dir: str = CACHE_DIR) -> str:
+    """
+    Returns the snapshot path of a parsed sheet
+
+    The path depends on the workbook contents, on every parsing option and on PARSER_VERSION,
+    so a changed workbook, spec or parser never reuses an old snapshot.
+
+    Args:
+        spec (SheetSpec): Sheet to parse
+        digest (str): Content hash of the workbook
+        cache_dir (str): Directory of the snapshots
+
+    Returns:
+        str: Path of the pickled DataFrame
+    """
+    options = repr((PARSER_VERSION, spec.sheet_name, spec.header_rows, sorted(spec.columns.items())))
+    key = hashlib.blake2b((digest + options).encode()).hexdigest()
+    return os.path.join(cache_dir, f"{key}.pkl")
+
+def _cell(value):
+    # whole floats are read as ints, like pandas.read_excel does
+    return int(value) if isinstance(value, float) and value.is_integer() else value
+
+def _rows(spec: SheetSpec, workbook= None) -> Iterator[list]:
+    indices = [column_index_from_string(letter) - 1 for letter in spec.columns]
+    owned = workbook is None
+    if owned:
+        workbook = load_workbook(spec.file_path, read_only= True, data_only= True)
+    try:
+        for row in workbook[spec.sheet_name].iter_rows(min_row= spec.header_rows + 1, max_col= max(indices) + 1,
+                                                        values_only= True):
+            if row[indices[0]] in (None, ""):
+                break
+            yield [_cell(row[i]) for i in indices]
+    finally:
+        if owned:
+            workbook.close()
+
+def read_sheet(spec: SheetSpec) -> pd.DataFrame:
+    """
+    Parses the columns of one sheet of a workbook
+
+    The sheet is streamed row by row in read only mode and cells right of the last wanted
+    column are never materialized.
+
+    Args:
+        spec (SheetSpec): Sheet to parse
+
+    Returns:
+        pd.DataFrame: Parsed columns, in the order of spec.columns
+    """
+    return pd.DataFrame(list(_rows(spec)), columns= list(spec.columns.values()))
+
+def iter_sheet(spec: SheetSpec, chunk_rows: int, workbook= None) -> Iterator[pd.DataFrame]:
+    """
+    Parses the columns of one sheet of a workbook in chunks of rows
+
+    Only one chunk of the sheet is held at a time, see read_sheet. Several sheets can be read
+    from one open workbook, opening a workbook in read only mode scans all of its sheets.
+
+    Args:
+        spec (SheetSpec): Sheet to parse
+        chunk_rows (int): Rows per chunk
+        workbook (openpyxl.Workbook | None): Workbook of spec.file_path opened in read only
+            mode, opened and closed by the iterator if None
+
+    Yields:
+        pd.DataFrame: Parsed columns of the next rows, in the order of spec.columns
+    """
+    rows = _rows(spec, workbook)
+    try:
+        while chunk := list(islice(rows, chunk_rows)):
+            yield pd.DataFrame(chunk, columns= list(spec.columns.values()))
+    finally:
+        rows.close()
+
+def write_sheet_cache(df: pd.DataFrame, path: str):
+    """
+    Pickles a parsed sheet, replacing any existing snapshot atomically
+
+    Args:
+        df (pd.DataFrame): Parsed sheet
+        path (str): Snapshot path, see sheet_cache_path
+    """
+    with atomic_write(path) as tmp_path:
+        df.to_pickle(tmp_path)
+
+def read_sheets(specs: list[SheetSpec], workers: int | None = None, cache_dir: str | None = CACHE_DIR,
+                digests: dict[str, str] | None = None) -> list[pd.DataFrame]:
+    """
+    Parses several sheets, reusing cached snapshots and parsing the rest in parallel
+
+    Args:
+        specs (list[SheetSpec]): Sheets to parse
+        workers (int | None): Number of worker processes, defaults to one per CPU
+        cache_dir (str | None): Directory of the snapshots, None disables the cache
+        digests (dict[str, str] | None): Content hashes already taken of the workbooks, by
+            path, the other workbooks are hashed once
+
+    Returns:
+        list[pd.DataFrame]: Parsed sheets, in the order of specs
+    """
+    digests = dict(digests or {})
+    results = [None] * len(specs)
+    missing = []
+
+    for i, spec in enumerate(specs):
+        if cache_dir is None:
+            missing.append(i)
+            continue
+
+        if spec.file_path not in digests:
+            digests[spec.file_path] = file_digest(spec.file_path)
+        path = sheet_cache_path(spec, digests[spec.file_path], cache_dir)
+
+        if os.path.exists(path):
+            results[i] = pd.read_pickle(path)
+        else:
+            missing.append(i)
+
+    if len(missing) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers= workers) as pool:
+            parsed = list(pool.map(read_sheet, [specs[i] for i in missing]))
+    else:
+        parsed = [read_sheet(specs[i]) for i in missing]
+
+    for i, df in zip(missing, parsed):
+        results[i] = df
+        if cache_dir is not None:
+            write_sheet_cache(df, sheet_cache_path(specs[i], digests[specs[i].file_path], cache_dir))
+
+    return results
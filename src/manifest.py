@@ -0,0 +1,134 @@
+import json
+import os
+
+from data_cache import FileCache, file_digest
+
+# bump whenever a change to the pipeline changes its outputs
+PIPELINE_VERSION = "3"
+MANIFEST_PATH = "./data/manifest.json"
+
+_VERSION_CACHE = FileCache(1024 ** 2, sizeof= len)
+
+def load_manifest(path: str = MANIFEST_PATH) -> dict:
+    """
+    Reads the build manifest
+
+    A missing manifest, or one written by another pipeline version, is returned empty so
+    every output is rebuilt.
+
+    Args:
+        path (str): Manifest path
+
+    Returns:
+        dict: Manifest with "pipeline_version", "years" and "artifacts" keys
+    """
+    empty = {"pipeline_version": PIPELINE_VERSION, "years": {}, "artifacts": {}}
+    if not os.path.exists(path):
+        return empty
+
+    with open(path) as f:
+        manifest = json.load(f)
+
+    if manifest.get("pipeline_version") != PIPELINE_VERSION:
+        return empty
+    return manifest
+
+def save_manifest(manifest: dict, path: str = MANIFEST_PATH):
+    """
+    Writes the build manifest atomically
+
+    Args:
+        manifest (dict): Manifest to write
+        path (str): Manifest path
+    """
+    # data_store pulls in pyarrow and pandas, which reading the data version doesn't need
+    from data_store import atomic_write
+
+    with atomic_write(path) as tmp_path:
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent= 2, sort_keys= True)
+
+def stale_regions(manifest: dict, year: int, input_digest: str, compact_mode: bool = False) -> list | None:
+    """
+    Finds the regional outputs of a year that need rebuilding
+
+    Args:
+        manifest (dict): Build manifest
+        year (int): Year to check
+        input_digest (str): Current hash of the year's workbook, see data_cache.file_digest
+        compact_mode (bool): Whether the build holds compact frames, outputs of the other mode
+            hold different values
+
+    Returns:
+        list | None: Regions whose outputs are missing or modified, None if every region
+            has to be rebuilt because the workbook or the mode changed or it was never built
+    """
+    entry = manifest["years"].get(str(year))
+    if (entry is None or entry["input"].get("digest") != input_digest
+            or entry.get("compact", False) != compact_mode):
+        return None
+
+    stale = []
+    for region, outputs in entry["outputs"].items():
+        if any(file_digest(path) != digest for path, digest in outputs.items()):
+            stale.append(region)
+    return stale
+
+def record_year(manifest: dict, year: int, input_path: str, input_digest: str,
+                outputs: dict[str, dict[str, str]], compact_mode: bool = False):
+    """
+    Records the input and the written outputs of a year in the manifest
+
+    Args:
+        manifest (dict): Build manifest, updated in place
+        year (int): Year that was built
+        input_path (str): Path of the year's workbook
+        input_digest (str): Hash of the year's workbook
+        outputs (dict[str, dict[str, str]]): Written files and their hashes, by region
+        compact_mode (bool): Whether the outputs were written from compact frames
+    """
+    entry = manifest["years"].setdefault(str(year), {"outputs": {}})
+    entry["input"] = {"path": input_path, "digest": input_digest}
+    entry["compact"] = compact_mode
+    entry["outputs"].update(outputs)
+
+def artifacts_current(manifest: dict, paths: list, compact_mode: bool = False) -> bool:
+    """
+    Checks that every derived artifact was recorded in the same mode and not modified since
+
+    Args:
+        manifest (dict): Build manifest
+        paths (list): Paths of the artifacts the pipeline produces
+        compact_mode (bool): Whether the build holds compact frames
+
+    Returns:
+        bool: True if every artifact is recorded and unchanged
+    """
+    artifacts = manifest.get("artifacts", {})
+    if manifest.get("artifacts_compact", False) != compact_mode:
+        return False
+    return all(path in artifacts and file_digest(path) == artifacts[path] for path in paths)
+
+def record_artifacts(manifest: dict, artifacts: dict[str, str], compact_mode: bool = False):
+    """
+    Records the derived artifacts in the manifest, replacing the previous ones
+
+    Args:
+        manifest (dict): Build manifest, updated in place
+        artifacts (dict[str, str]): Written files and their hashes
+        compact_mode (bool): Whether the artifacts were derived from compact outputs
+    """
+    manifest["artifacts"] = artifacts
+    manifest["artifacts_compact"] = compact_mode
+
+def data_version(path: str = MANIFEST_PATH) -> str:
+    """
+    Returns an identifier of the current build, which changes whenever the pipeline writes
+
+    Args:
+        path (str): Manifest path
+
+    Returns:
+        str: Hash of the manifest, empty if there is none
+    """
+    return _VERSION_CACHE.load(os.path.abspath(path), path, lambda: file_digest(path) or "")
@@ -0,0 +1,251 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+LOG_PATH = os.environ.get("MPI_PROFILE_LOG", "./logs/timings.jsonl")
+
+_settings = {"enabled": False, "log_path": LOG_PATH}
+_log_lock = threading.Lock()
+_local = threading.local()
+
+# stages of the process start, until its first run finishes
+_startup = {"records": [], "finished": False}
+_startup_lock = threading.Lock()
+
+def enable(log_path: str = LOG_PATH, memory: bool = False):
+    """
+    Turns on timing of every stage and writes the records to a log file
+
+    Args:
+        log_path (str): JSON lines file the records are appended to
+        memory (bool): Also trace Python allocations to record each stage's peak memory
+    """
+    _settings.update(enabled= True, log_path= log_path)
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+def is_enabled() -> bool:
+    """
+    Returns whether records are written to the log file
+    """
+    return _settings["enabled"]
+
+def start_run(label: str, collect: bool = False):
+    """
+    Starts collecting the records of the current thread, e.g. one rerun of the dashboard
+
+    Args:
+        label (str): Label added to every record of the run
+        collect (bool): Keep the records in memory even when logging is disabled
+    """
+    now = time.perf_counter()
+    _local.run = {"label": label, "records": [], "collect": collect or is_enabled(),
+                  "started": now, "checkpoint": now}
+
+def run_seconds() -> float:
+    """
+    Returns the time elapsed since the current thread's run started
+
+    Returns:
+        float: Seconds, 0 if no run was started
+    """
+    run = getattr(_local, "run", None)
+    return time.perf_counter() - run["started"] if run else 0.0
+
+def run_records() -> list[dict]:
+    """
+    Returns the records of the current thread's run
+
+    Returns:
+        list[dict]: Records in the order the stages finished
+    """
+    run = getattr(_local, "run", None)
+    return list(run["records"]) if run else []
+
+def max_rss_mib() -> float | None:
+    """
+    Returns the peak resident memory of the process
+
+    Returns:
+        float | None: Peak RSS in MiB, None where it is not available
+    """
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _emit(record: dict):
+    run = getattr(_local, "run", None)
+    if run is not None:
+        record["run"] = run["label"]
+        if run["collect"]:
+            run["records"].append(record)
+    _write(record)
+
+def _write(record: dict):
+    if is_enabled():
+        path = _settings["log_path"]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok= True)
+        with _log_lock, open(path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+def _active() -> bool:
+    run = getattr(_local, "run", None)
+    return is_enabled() or (run is not None and run["collect"])
+
+@contextmanager
+def stage(name: str, **fields):
+    """
+    Times the enclosed block and emits a record when it finishes
+
+    Records hold the stage name, wall time, peak traced memory of the block (when memory
+    tracing is on, and only since the last nested stage started) and the process' peak RSS,
+    plus any extra fields. Does nothing unless profiling is enabled or the current run
+    collects records.
+
+    Args:
+        name (str): Stage name, e.g. "pipeline.read_excel"
+        **fields: Extra values stored in the record
+    """
+    if not _active():
+        yield
+        return
+
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record = {"stage": name, "seconds": time.perf_counter() - start,
+                  "time": datetime.now(timezone.utc).isoformat(), **fields}
+        if tracing:
+            record["peak_mib"] = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        record["max_rss_mib"] = max_rss_mib()
+        _emit(record)
+
+def timed(name: str | None = None) -> Callable:
+    """
+    Decorator timing every call of a function as a stage
+
+    Args:
+        name (str | None): Stage name, defaults to the function's qualified name
+
+    Returns:
+        Callable: Decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        stage_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(stage_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def checkpoint(name: str, **fields):
+    """
+    Emits a record for the time since the previous checkpoint of the current run
+
+    Meant for scripts, like the dashboard, that run their sections one after another.
+
+    Args:
+        name (str): Name of the section that just finished
+        **fields: Extra values stored in the record
+    """
+    run = getattr(_local, "run", None)
+    if run is None:
+        return
+
+    now = time.perf_counter()
+    seconds, run["checkpoint"] = now - run["checkpoint"], now
+    if _active():
+        _emit({"stage": name, "seconds": seconds, "time": datetime.now(timezone.utc).isoformat(),
+               "max_rss_mib": max_rss_mib(), **fields})
+
+def process_seconds() -> float | None:
+    """
+    Returns the time since the process was launched
+
+    Returns:
+        float | None: Seconds, None where /proc is not available
+    """
+    try:
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        with open("/proc/self/stat") as f:
+            # fields after the parenthesized command name, the start time is the 22nd field
+            started = int(f.read().rsplit(")", 1)[1].split()[19])
+    except (OSError, IndexError, ValueError):
+        return None
+    return uptime - started / os.sysconf("SC_CLK_TCK")
+
+@contextmanager
+def startup_stage(name: str):
+    """
+    Times the enclosed block as a stage of the process start
+
+    Only blocks that run before finish_startup is called are recorded, so the block can sit in
+    code that runs again later, like the imports of the dashboard script.
+
+    Args:
+        name (str): Stage name, e.g. "startup.imports"
+    """
+    if _startup["finished"]:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        with _startup_lock:
+            if not _startup["finished"]:
+                _startup["records"].append({"stage": name, "seconds": time.perf_counter() - start})
+
+def finish_startup(**fields) -> bool:
+    """
+    Ends the startup report, once per process, and logs it like every other stage
+
+    Args:
+        **fields: Extra values stored in the total record
+
+    Returns:
+        bool: True for the call that ended the report
+    """
+    with _startup_lock:
+        if _startup["finished"]:
+            return False
+        _startup["finished"] = True
+        records = _startup["records"]
+        records.append({"stage": "startup.since_launch", "seconds": process_seconds(), **fields})
+
+    now = datetime.now(timezone.utc).isoformat()
+    for record in records:
+        record.update(time= now, max_rss_mib= max_rss_mib(), run= "startup")
+        _write(record)
+    return True
+
+def startup_records() -> list[dict]:
+    """
+    Returns the stages of the process start
+
+    Returns:
+        list[dict]: Records in the order the stages finished, empty until finish_startup is called
+    """
+    return list(_startup["records"]) if _startup["finished"] else []
+
+if os.environ.get("MPI_PROFILE", "") not in ("", "0"):
+    enable(memory= os.environ.get("MPI_PROFILE_MEMORY", "") not in ("", "0"))
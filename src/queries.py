@@ -0,0 +1,202 @@
+from itertools import product
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from aggregates import headline, load_cube, over_time
+from columns import DIMENSIONS
+from countries import country_history, load_country_index
+from rankings import TOP_K, load_rankings, top_k
+from uncertainty import load_intervals
+
+# answers shared by the dashboard and the API, as plain Python values ready to serialize
+
+def _value(value) -> float | None:
+    return float(value) if pd.notna(value) and np.isfinite(value) else None
+
+def regions() -> list[str]:
+    """
+    Returns the region keys with data
+
+    Returns:
+        list[str]: Region keys, e.g. "global"
+    """
+    return list(load_cube().index.unique("Region"))
+
+def years(key: str | None = None) -> list[int]:
+    """
+    Returns the years with data
+
+    Args:
+        key (str | None): Region key, every region if None
+
+    Returns:
+        list[int]: Years, newest first
+    """
+    cube = load_cube()
+    if key is not None:
+        if key not in cube.index.unique("Region"):
+            return []
+        cube = cube.loc[key]
+    return sorted(map(int, cube.index.unique("Year")), reverse= True)
+
+def headline_metrics(key: str, year: int) -> dict[str, dict] | None:
+    """
+    Returns the MPI and dimension values of a region and year with their yearly change
+
+    Args:
+        key (str): Region key
+        year (int): Year
+
+    Returns:
+        dict[str, dict] | None: value, previous, delta and delta_pct by dimension, None if
+            there is no data
+    """
+    try:
+        metrics = headline(load_cube(), key, year)
+    except KeyError:
+        return None
+    return {dimension: {"value": _value(row["Value"]), "previous": _value(row["Previous"]),
+                        "delta": _value(row["Delta"]), "delta_pct": _value(row["Delta %"])}
+            for dimension, row in metrics.loc[["MPI"] + list(DIMENSIONS)].iterrows()}
+
+def mpi_interval(key: str, year: int) -> dict | None:
+    """
+    Returns the bootstrap confidence interval of a region's MPI and of its yearly change
+
+    Args:
+        key (str): Region key
+        year (int): Year
+
+    Returns:
+        dict | None: se, lower, upper, delta_pct_lower and delta_pct_upper, None if there is no
+            data
+    """
+    try:
+        row = load_intervals().loc[(key, year)]
+    except KeyError:
+        return None
+    return {"se": _value(row["SE"]), "lower": _value(row["Lower"]), "upper": _value(row["Upper"]),
+            "delta_pct_lower": _value(row["Delta % Lower"]), "delta_pct_upper": _value(row["Delta % Upper"])}
+
+def trend(key: str, years: list) -> list[dict]:
+    """
+    Returns the dimension values of a region over several years
+
+    Args:
+        key (str): Region key
+        years (list): Years, missing years are skipped
+
+    Returns:
+        list[dict]: Year and dimension values, newest year first
+    """
+    cube = load_cube()
+    if key not in cube.index.unique("Region"):
+        return []
+    return [{col: int(value) if col == "Year" else _value(value) for col, value in row.items()}
+            for row in over_time(cube, key, years).to_dict("records")]
+
+def missing_years(key: str, years: list) -> list[int]:
+    """
+    Returns the years without data for a region
+
+    Args:
+        key (str): Region key
+        years (list): Years to check
+
+    Returns:
+        list[int]: Missing years, in the order of years
+    """
+    available = {row["Year"] for row in trend(key, years)}
+    return [year for year in years if year not in available]
+
+def top_countries(key: str, year: int, dimensions: list, order: str = "largest", k: int = 5) -> list[dict]:
+    """
+    Returns the k largest or smallest scoring countries of a region and year
+
+    Args:
+        key (str): Region key
+        year (int): Year
+        dimensions (list): Dimensions the score sums up, at least one
+        order (str): "largest" or "smallest"
+        k (int): Number of countries, at most rankings.TOP_K
+
+    Returns:
+        list[dict]: rank, row (position in the regional frame), country and score, best ranked first
+    """
+    if not dimensions or not set(dimensions) <= set(DIMENSIONS):
+        raise ValueError(f"dimensions must be a non empty subset of {list(DIMENSIONS)}")
+    if order not in ("largest", "smallest"):
+        raise ValueError("order must be 'largest' or 'smallest'")
+    if not 0 < k <= TOP_K:
+        raise ValueError(f"k must be between 1 and {TOP_K}")
+
+    try:
+        ranked = top_k(load_rankings(), key, year, dimensions, order, k)
+    except KeyError:
+        return []
+    return [{"rank": int(rank), "row": int(row), "country": country, "score": _value(score)}
+            for rank, row, country, score in ranked[["Rank", "Row", "Country", "Score"]].itertuples(index= False)]
+
+def country_trend(countries: list, start: int | None = None, end: int | None = None) -> list[dict]:
+    """
+    Returns the yearly MPI and dimension values of several countries
+
+    Args:
+        countries (list): Country names, unknown names are skipped
+        start (int | None): First year, unbounded if None
+        end (int | None): Last year, unbounded if None
+
+    Returns:
+        list[dict]: Country, Year, MPI and dimension values, newest year first
+    """
+    history = country_history(load_country_index(), countries, start, end)
+    columns = ["Country", "Year", "MPI"] + list(DIMENSIONS)
+    return [{"Country": country, "Year": int(year), **{col: _value(value) for col, value in zip(columns[2:], values)}}
+            for country, year, *values in history[columns].itertuples(index= False)]
+
+def country_metrics(country: str, year: int) -> dict[str, dict] | None:
+    """
+    Returns the dimension values of a country and their change since the previous year
+
+    The MPI of a country is the sum of its three dimensions.
+
+    Args:
+        country (str): Country name
+        year (int): Year
+
+    Returns:
+        dict[str, dict] | None: value and delta_pct (None without a previous year) by metric,
+            None if there is no data
+    """
+    history = country_history(load_country_index(), [country], year - 1, year)
+    current, previous = (history.loc[history["Year"] == y, list(DIMENSIONS)] for y in (year, year - 1))
+    if current.empty:
+        return None
+
+    metrics = {}
+    with np.errstate(divide= "ignore", invalid= "ignore"):
+        for metric in ["MPI"] + list(DIMENSIONS):
+            cols = list(DIMENSIONS) if metric == "MPI" else [metric]
+            value = current[cols].sum(axis= 1).values[0]
+            prev = previous[cols].sum(axis= 1).values[0] if not previous.empty else None
+            metrics[metric] = {"value": _value(value),
+                               "delta_pct": None if prev is None else _value((value - prev) / prev * 100)}
+    return metrics
+
+def batch(query: Callable, regions: list, years: list, **params) -> list[dict]:
+    """
+    Runs a region and year query for every combination of regions and years
+
+    Args:
+        query (Callable): Query taking a region key and a year, e.g. headline_metrics
+        regions (list): Region keys
+        years (list): Years
+        **params: Extra arguments of the query
+
+    Returns:
+        list[dict]: region, year and result of every combination
+    """
+    return [{"region": key, "year": year, "result": query(key, year, **params)}
+            for key, year in product(regions, years)]
@@ -0,0 +1,127 @@
+import os
+from itertools import combinations
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from columns import DIMENSIONS, INDICATORS
+from data_cache import FRAME_CACHE
+from data_store import DATASET_DIR, atomic_write, open_dataset
+
+RANKINGS_PATH = "./data/processed/rankings.parquet"
+TOP_K = 10
+
+# every non-empty combination of the dashboard's dimension checkboxes
+COMBOS = [dims for n in range(1, len(DIMENSIONS) + 1) for dims in combinations(DIMENSIONS, n)]
+
+def combo_key(dimensions: list) -> str:
+    """
+    Returns the key of a combination of dimensions
+
+    Args:
+        dimensions (list): Selected dimensions
+
+    Returns:
+        str: Key, e.g. "Health + Living Standards"
+    """
+    return " + ".join(dimension for dimension in DIMENSIONS if dimension in dimensions)
+
+def score_columns(dimensions: list) -> list:
+    """
+    Returns the columns summed into a country's score for a combination of dimensions
+
+    With every dimension selected the dimension rollups are used, otherwise the
+    indicators of the selected dimensions.
+
+    Args:
+        dimensions (list): Selected dimensions
+
+    Returns:
+        list: Column names
+    """
+    if len(dimensions) == len(DIMENSIONS):
+        return list(DIMENSIONS)
+    return [col for dimension in DIMENSIONS if dimension in dimensions for col in DIMENSIONS[dimension]]
+
+def build_rankings(dataset_dir: str = DATASET_DIR, k: int = TOP_K) -> pd.DataFrame:
+    """
+    Builds the k largest and smallest scoring countries of every region, year and combination
+
+    Ties keep the order of the rows in the dataset, as nlargest and nsmallest do.
+
+    Args:
+        dataset_dir (str): Root directory of the dataset
+        k (int): Number of countries kept at each end
+
+    Returns:
+        pd.DataFrame: Region, Year, Combo, Order, Rank, Row, Country and Score columns, where
+            Row is the position of the country in its (region, year) partition
+    """
+    columns = ["region", "year", "Country"] + INDICATORS + list(DIMENSIONS)
+    df = open_dataset(dataset_dir).to_table(columns= columns).to_pandas()
+    df = df.rename(columns= {"region": "Region", "year": "Year"})
+    df["Row"] = df.groupby(["Region", "Year"]).cumcount()
+
+    scores = pd.DataFrame({combo_key(dims): df[score_columns(dims)].sum(axis= 1) for dims in COMBOS})
+    long = pd.concat([df[["Region", "Year", "Row", "Country"]], scores], axis= 1).melt(
+        id_vars= ["Region", "Year", "Row", "Country"], var_name= "Combo", value_name= "Score")
+
+    rankings = []
+    for order, ascending in (("largest", False), ("smallest", True)):
+        ranked = long.sort_values(["Region", "Year", "Combo", "Score", "Row"],
+                                  ascending= [True, True, True, ascending, True], kind= "stable")
+        ranked["Rank"] = ranked.groupby(["Region", "Year", "Combo"]).cumcount() + 1
+        rankings.append(ranked.loc[ranked["Rank"] <= k].assign(Order= order))
+
+    rankings = pd.concat(rankings, ignore_index= True)
+    return rankings[["Region", "Year", "Combo", "Order", "Rank", "Row", "Country", "Score"]]
+
+def write_rankings(rankings: pd.DataFrame, path: str = RANKINGS_PATH) -> str:
+    """
+    Writes the rankings atomically
+
+    Args:
+        rankings (pd.DataFrame): Rankings created by build_rankings
+        path (str): Output path
+
+    Returns:
+        str: Path of the written file
+    """
+    with atomic_write(path) as tmp_path:
+        pq.write_table(pa.Table.from_pandas(rankings, preserve_index= False), tmp_path)
+    return path
+
+def load_rankings(path: str = RANKINGS_PATH) -> pd.DataFrame:
+    """
+    Reads the rankings through the process wide cache, indexed by (Region, Year, Combo, Order)
+
+    Args:
+        path (str): Path of the rankings
+
+    Returns:
+        pd.DataFrame: Indexed rankings, sorted by Rank within each index value
+    """
+    def loader() -> pd.DataFrame:
+        rankings = pd.read_parquet(path)
+        return rankings.set_index(["Region", "Year", "Combo", "Order"]).sort_index(kind= "stable")
+
+    return FRAME_CACHE.load(("rankings", os.path.abspath(path)), path, loader)
+
+def top_k(rankings: pd.DataFrame, key: str, year: int, dimensions: list, order: str = "largest",
+          k: int = 5) -> pd.DataFrame:
+    """
+    Returns the k largest or smallest scoring countries of a region and year
+
+    Args:
+        rankings (pd.DataFrame): Indexed rankings
+        key (str): Region key
+        year (int): Year
+        dimensions (list): Selected dimensions
+        order (str): "largest" or "smallest"
+        k (int): Number of countries, at most the k the rankings were built with
+
+    Returns:
+        pd.DataFrame: Rank, Row, Country and Score of the countries, best ranked first
+    """
+    return rankings.loc[(key, year, combo_key(dimensions), order)].iloc[:k]
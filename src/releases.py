@@ -0,0 +1,184 @@
+import json
+import os
+from itertools import groupby
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from data_cache import FileCache
+from data_store import DATASET_DIR, atomic_write, open_dataset
+
+RELEASES_DIR = "./data/processed/releases"
+
+# releases kept next to the current one, so processes still mapping them keep working
+KEEP_RELEASES = 2
+
+# current release of every releases directory mapped by this process, revalidated against its CURRENT pointer
+_RELEASE_CACHE = FileCache(4, sizeof= lambda release: 1)
+
+def current_path(releases_dir: str = RELEASES_DIR) -> str:
+    """
+    Returns the path of the file naming the current release
+
+    Args:
+        releases_dir (str): Directory of the releases
+
+    Returns:
+        str: Path of the pointer file
+    """
+    return os.path.join(releases_dir, "CURRENT")
+
+def history_path(releases_dir: str = RELEASES_DIR) -> str:
+    """
+    Returns the path of the file listing the releases in the order they were published
+
+    Args:
+        releases_dir (str): Directory of the releases
+
+    Returns:
+        str: Path of the history file, one release file name per line, oldest first
+    """
+    return os.path.join(releases_dir, "HISTORY")
+
+def _prune(releases_dir: str, name: str):
+    try:
+        with open(history_path(releases_dir)) as f:
+            history = [line for line in f.read().split() if line != name]
+    except FileNotFoundError:
+        history = []
+
+    # releases published before the history was kept are older than every listed one
+    files = {entry.name for entry in os.scandir(releases_dir) if entry.name.endswith(".arrow")}
+    unlisted = sorted(files - set(history) - {name})
+    order = unlisted + [listed for listed in history if listed in files] + [name]
+    kept = order[-(KEEP_RELEASES + 1):]
+
+    with atomic_write(history_path(releases_dir)) as tmp_path, open(tmp_path, "w") as f:
+        f.write("\n".join(kept) + "\n")
+    for old in order[:-len(kept)]:
+        os.remove(os.path.join(releases_dir, old))
+
+def is_current(version: str, releases_dir: str = RELEASES_DIR) -> bool:
+    """
+    Returns whether a version is the current release
+
+    Args:
+        version (str): Version of the data
+        releases_dir (str): Directory of the releases
+
+    Returns:
+        bool: True if the pointer names the version and its file exists
+    """
+    name = f"{version}.arrow"
+    try:
+        with open(current_path(releases_dir)) as f:
+            return f.read().strip() == name and os.path.exists(os.path.join(releases_dir, name))
+    except FileNotFoundError:
+        return False
+
+def publish_release(version: str, dataset_dir: str = DATASET_DIR, releases_dir: str = RELEASES_DIR) -> str:
+    """
+    Publishes the dataset as an uncompressed Arrow IPC file and makes it the current release
+
+    Every (region, year) partition is written as its own record batch, so readers can map the
+    file and slice out a partition without copying it. The CURRENT pointer is replaced
+    atomically once the file is complete. Releases are pruned in the order they were published,
+    recorded in the history file, so only the current one and the KEEP_RELEASES published
+    before it are kept whatever the modification times of the files.
+
+    Args:
+        version (str): Version of the data, used in the file name
+        dataset_dir (str): Root directory of the dataset
+        releases_dir (str): Directory of the releases
+
+    Returns:
+        str: Path of the published release
+    """
+    table = open_dataset(dataset_dir).to_table().replace_schema_metadata(None)
+    table = table.sort_by([("region", "ascending"), ("year", "ascending")])
+    keys = pc.binary_join_element_wise(table["region"], pc.cast(table["year"], pa.string()), "/")
+    table = table.drop_columns(["region", "year"])
+
+    batches, partitions = [], {}
+    start = 0
+    for key, rows in groupby(keys.to_pylist()):
+        size = len(list(rows))
+        partitions[key] = len(batches)
+        batches.extend(table.slice(start, size).combine_chunks().to_batches())
+        start += size
+
+    schema = table.schema.with_metadata({"partitions": json.dumps(partitions)})
+    name = f"{version}.arrow"
+    path = os.path.join(releases_dir, name)
+    with atomic_write(path) as tmp_path, pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+
+    with atomic_write(current_path(releases_dir)) as tmp_path, open(tmp_path, "w") as f:
+        f.write(name)
+
+    _prune(releases_dir, name)
+    return path
+
+def current_release(releases_dir: str = RELEASES_DIR) -> tuple[pa.ipc.RecordBatchFileReader, dict] | None:
+    """
+    Maps the current release read only, once per process and release
+
+    The pointer is revalidated like every cached file, so a newly published release is picked
+    up by running processes. The replaced release is dropped from the cache before the new one
+    is mapped, and unmapped once the last batch read from it is released. Mapped pages are
+    shared by every process mapping the release.
+
+    Args:
+        releases_dir (str): Directory of the releases
+
+    Returns:
+        tuple[pa.ipc.RecordBatchFileReader, dict] | None: Reader and record batch of every
+            "region/year" partition, None if no release was published
+    """
+    pointer = current_path(releases_dir)
+    key = os.path.abspath(pointer)
+
+    def loader() -> tuple[pa.ipc.RecordBatchFileReader, dict] | None:
+        _RELEASE_CACHE.pop(key)
+        try:
+            with open(pointer) as f:
+                name = f.read().strip()
+        except FileNotFoundError:
+            return None
+        reader = pa.ipc.open_file(pa.memory_map(os.path.join(releases_dir, name), "r"))
+        return reader, json.loads(reader.schema.metadata[b"partitions"])
+
+    return _RELEASE_CACHE.load(key, pointer, loader)
+
+def release_frame(key: str, year: int, columns: list | None = None,
+                  releases_dir: str = RELEASES_DIR) -> pd.DataFrame | None:
+    """
+    Returns one (region, year) slice of the current release as zero-copy views of the mapping
+
+    Numeric columns are backed by the mapped file and are read only. Cheap enough to call on
+    every rerun, so the returned DataFrame is not cached.
+
+    Args:
+        key (str): Region key, e.g. "global"
+        year (int): Year to read
+        columns (list | None): Columns to return, all columns if None
+        releases_dir (str): Directory of the releases
+
+    Returns:
+        pd.DataFrame | None: Matching rows, empty if the partition does not exist, None if no
+            release was published
+    """
+    release = current_release(releases_dir)
+    if release is None:
+        return None
+
+    reader, partitions = release
+    index = partitions.get(f"{key}/{year}")
+    if index is None:
+        return reader.schema.remove_metadata().empty_table().to_pandas()[columns or reader.schema.names]
+
+    batch = reader.get_batch(index)
+    return (batch.select(columns) if columns else batch).to_pandas(split_blocks= True)
@@ -0,0 +1,143 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from columns import DIMENSIONS, INDICATORS
+from data_cache import LRUCache, frame_nbytes
+from data_store import DATASET_DIR, cached_frame
+from manifest import data_version
+
+# official weights: every dimension is a third, split equally between its indicators
+OFFICIAL_WEIGHTS = np.array([1 / len(DIMENSIONS) / len(cols)
+                             for cols in DIMENSIONS.values() for _ in cols])
+
+# indicator x dimension membership, in the order of INDICATORS and DIMENSIONS
+MEMBERSHIP = np.array([[col in cols for cols in DIMENSIONS.values()] for col in INDICATORS], dtype= float)
+
+# columns a scenario is computed from
+SCENARIO_COLS = ["Country", "Weight"] + INDICATORS
+
+class ScenarioMatrix(NamedTuple):
+    """
+    One region and year in the form scenarios are computed from
+
+    Args:
+        countries (np.ndarray): Country names
+        headcounts (np.ndarray): Countries x indicators matrix of censored headcount ratios,
+            the share of people who are poor and deprived in each indicator
+        population (np.ndarray): Population weight of every country within the region
+    """
+    countries: np.ndarray
+    headcounts: np.ndarray
+    population: np.ndarray
+
+# matrices and scenario results, keyed by data version
+_MATRIX_CACHE = LRUCache(16 * 1024 ** 2, sizeof= lambda matrix: sum(part.nbytes for part in matrix))
+SCENARIO_CACHE = LRUCache(32 * 1024 ** 2, sizeof= lambda result: frame_nbytes(result[1]))
+
+def dimension_weights(dimensions: dict[str, float]) -> np.ndarray:
+    """
+    Returns indicator weights giving every dimension a share, split equally between its indicators
+
+    Args:
+        dimensions (dict[str, float]): Share of every dimension, normalized to sum to one
+
+    Returns:
+        np.ndarray: Weight of every indicator, in the order of INDICATORS
+    """
+    shares = np.array([float(dimensions.get(dimension, 0)) for dimension in DIMENSIONS])
+    if (shares < 0).any() or shares.sum() <= 0:
+        raise ValueError("dimension shares must be non negative and not all zero")
+    return MEMBERSHIP @ (shares / shares.sum() / MEMBERSHIP.sum(axis= 0))
+
+def to_matrix(df: pd.DataFrame) -> ScenarioMatrix:
+    """
+    Converts a regional DataFrame into its scenario matrix
+
+    The indicator columns of the dataset hold their contribution to the MPI, the censored
+    headcount ratio times the official weight, so dividing by the weight recovers the ratios.
+
+    Args:
+        df (pd.DataFrame): Regional DataFrame with the SCENARIO_COLS columns
+
+    Returns:
+        ScenarioMatrix: Matrix of the region
+    """
+    headcounts = df[INDICATORS].to_numpy(dtype= float) / OFFICIAL_WEIGHTS
+    return ScenarioMatrix(df["Country"].to_numpy(dtype= object), headcounts, df["Weight"].to_numpy(dtype= float))
+
+def scenario_matrix(key: str, year: int, dataset_dir: str = DATASET_DIR) -> ScenarioMatrix:
+    """
+    Returns the scenario matrix of a region and year, built once per data version
+
+    Args:
+        key (str): Region key, e.g. "global"
+        year (int): Year
+        dataset_dir (str): Root directory of the dataset
+
+    Returns:
+        ScenarioMatrix: Matrix of the region, with no rows if there is no data
+    """
+    cache_key = (data_version(), key, year, dataset_dir)
+    matrix = _MATRIX_CACHE.get(cache_key)
+    if matrix is None:
+        matrix = to_matrix(cached_frame(key, year, SCENARIO_COLS, dataset_dir))
+        _MATRIX_CACHE.put(cache_key, matrix)
+    return matrix
+
+def apply_weights(matrix: ScenarioMatrix, weights: np.ndarray) -> tuple[float, pd.DataFrame]:
+    """
+    Recomputes the MPI, dimension contributions and ranks of every country under new weights
+
+    The dimension contributions of every country come out of one matrix product, and the MPI
+    is their sum. Who counts as poor is kept as published, only the weighting of the
+    deprivations of the poor changes.
+
+    Args:
+        matrix (ScenarioMatrix): Matrix of a region and year
+        weights (np.ndarray): Weight of every indicator, normalized to sum to one
+
+    Returns:
+        tuple[float, pd.DataFrame]: Population weighted MPI of the region, and Country, MPI,
+            dimension, Rank, Official MPI, Official Rank and Rank Change columns of every
+            country, poorest first
+    """
+    weights = np.asarray(weights, dtype= float)
+    if weights.shape != (len(INDICATORS),) or (weights < 0).any() or weights.sum() <= 0:
+        raise ValueError(f"weights must be {len(INDICATORS)} non negative values, not all zero")
+    weights = weights / weights.sum()
+
+    contributions = matrix.headcounts @ (MEMBERSHIP * weights[:, None])
+    mpi = contributions.sum(axis= 1)
+    official = matrix.headcounts @ OFFICIAL_WEIGHTS
+
+    result = pd.DataFrame(contributions, columns= list(DIMENSIONS))
+    result.insert(0, "Country", matrix.countries)
+    result.insert(1, "MPI", mpi)
+    result["Rank"] = result["MPI"].rank(method= "min", ascending= False).astype(int)
+    result["Official MPI"] = official
+    result["Official Rank"] = result["Official MPI"].rank(method= "min", ascending= False).astype(int)
+    result["Rank Change"] = result["Official Rank"] - result["Rank"]
+    return float(matrix.population @ mpi), result.sort_values("Rank", kind= "stable").reset_index(drop= True)
+
+def run_scenario(key: str, year: int, weights: np.ndarray,
+                 dataset_dir: str = DATASET_DIR) -> tuple[float, pd.DataFrame]:
+    """
+    Applies indicator weights to a region and year, caching the result
+
+    Args:
+        key (str): Region key, e.g. "global"
+        year (int): Year
+        weights (np.ndarray): Weight of every indicator, normalized to sum to one
+        dataset_dir (str): Root directory of the dataset
+
+    Returns:
+        tuple[float, pd.DataFrame]: See apply_weights, the DataFrame is shared and must not be modified
+    """
+    cache_key = (data_version(), key, year, tuple(np.round(weights, 12)), dataset_dir)
+    result = SCENARIO_CACHE.get(cache_key)
+    if result is None:
+        result = apply_weights(scenario_matrix(key, year, dataset_dir), weights)
+        SCENARIO_CACHE.put(cache_key, result)
+    return result
@@ -0,0 +1,91 @@
+from typing import NamedTuple
+
+from columns import INDICATORS
+
+NATIONAL_SHEET = "1.1 National MPI Results"
+CONTRIBUTIONS_SHEET = "1.3 Contribut'n of Deprivations"
+UNCERTAINTY_SHEET = "1.5 SEs & CIs"
+
+# rows above the first country of every sheet: title, notes, three header rows and a units row
+HEADER_ROWS = 9
+
+class SheetSchema(NamedTuple):
+    """
+    Describes where the columns the pipeline needs sit in one sheet of a release
+
+    Args:
+        name (str): Name of the sheet
+        header_rows (int): Rows above the first data row
+        columns (dict[str, str]): Column names by Excel column letter, the table ends at the
+            first row whose first column is empty
+    """
+    name: str
+    header_rows: int
+    columns: dict[str, str]
+
+class ReleaseSchema(NamedTuple):
+    """
+    Describes the sheets of one "Global MPI National Results" release
+
+    Args:
+        year (int): Release year
+        national (SheetSchema): National MPI results, with the population used as weight
+        contributions (SheetSchema): Contribution of every indicator to the MPI, in percent
+        uncertainty (SheetSchema): Standard error of every country's MPI
+        population (str): Column of the national sheet holding the population used as weight
+    """
+    year: int
+    national: SheetSchema
+    contributions: SheetSchema
+    uncertainty: SheetSchema
+    population: str
+
+def national_results_schema(year: int) -> ReleaseSchema:
+    """
+    Returns the schema of a release with the layout used since 2020
+
+    The population column holds the estimate two years before the release.
+
+    Args:
+        year (int): Release year
+
+    Returns:
+        ReleaseSchema: Schema of the release
+    """
+    population = f"Population {year - 2}"
+    national = SheetSchema(NATIONAL_SHEET, HEADER_ROWS, {
+        "B": "ISO Country Code", "C": "Country", "G": "MPI", "I": "Intensity", "Q": population})
+    contributions = SheetSchema(CONTRIBUTIONS_SHEET, HEADER_ROWS, {
+        "B": "ISO Country Code", "D": "Region", "G": "MPI",
+        **{letter: col for letter, col in zip("KLMNOPQRST", INDICATORS)}})
+    uncertainty = SheetSchema(UNCERTAINTY_SHEET, HEADER_ROWS, {"B": "ISO Country Code", "G": "MPI", "H": "MPI SE"})
+    return ReleaseSchema(year, national, contributions, uncertainty, population)
+
+# schemas of the supported releases, a new release year is supported by adding its entry
+SCHEMAS = {year: national_results_schema(year) for year in (2020, 2021, 2022, 2023)}
+
+def register(schema: ReleaseSchema):
+    """
+    Adds or replaces the schema of a release
+
+    Args:
+        schema (ReleaseSchema): Schema of the release
+    """
+    SCHEMAS[schema.year] = schema
+
+def release_schema(year: int) -> ReleaseSchema:
+    """
+    Returns the schema of a release
+
+    Args:
+        year (int): Release year
+
+    Returns:
+        ReleaseSchema: Schema of the release
+
+    Raises:
+        ValueError: No schema describes the release
+    """
+    if year not in SCHEMAS:
+        raise ValueError(f"No schema for the {year} release, add one to schemas.SCHEMAS.")
+    return SCHEMAS[year]
@@ -0,0 +1,97 @@
+import json
+import os
+
+from charts import FIGURE_CACHE
+from columns import DIMENSIONS
+from data_cache import FileCache
+from views import (DASHBOARD_COLS, DEFAULT_REGION, DEFAULT_YEAR, country_trend_figure, distribution_figure,
+                   over_time_figure, region_mapper, score_columns, score_figure)
+
+SNAPSHOT_PATH = "./data/processed/default_view.json"
+
+# the snapshot as read by this process, revalidated like every cached file
+_SNAPSHOT_CACHE = FileCache(2, sizeof= lambda snapshot: 1)
+
+def build_snapshot(version: str) -> dict:
+    """
+    Computes everything the dashboard shows for its default view
+
+    The figures are built through the same functions and cache keys as the dashboard, with
+    every checkbox checked and the first country selected.
+
+    Args:
+        version (str): Data version the snapshot is built for, see manifest.data_version
+
+    Returns:
+        dict: version, region, year, metrics, interval, missing_years, countries, country_metrics and
+            figures, a list of [cache key, figure JSON] pairs
+    """
+    from data_store import cached_frame
+    from queries import country_metrics, headline_metrics, missing_years, mpi_interval
+
+    key = region_mapper[DEFAULT_REGION]
+    df = cached_frame(key, DEFAULT_YEAR, DASHBOARD_COLS)
+    countries = list(df["Country"])
+    selected_cols, col_colors = score_columns(True, True, True)
+
+    FIGURE_CACHE.clear()
+    distribution_figure(DEFAULT_REGION, DEFAULT_YEAR, lambda: df, version)
+    over_time_figure(DEFAULT_REGION, DEFAULT_YEAR, version)
+    for order in ("largest", "smallest"):
+        score_figure(order, DEFAULT_REGION, DEFAULT_YEAR, list(DIMENSIONS), lambda: df, selected_cols, col_colors, version)
+    country_trend_figure(DEFAULT_YEAR, countries[:1], selected_cols, col_colors, version)
+
+    return {"version": version, "region": DEFAULT_REGION, "year": DEFAULT_YEAR,
+            "metrics": headline_metrics(key, DEFAULT_YEAR), "interval": mpi_interval(key, DEFAULT_YEAR),
+            "missing_years": missing_years(key, [DEFAULT_YEAR - i for i in range(1, 4)]),
+            "countries": countries, "country_metrics": {countries[0]: country_metrics(countries[0], DEFAULT_YEAR)},
+            "figures": [[list(key), figure_json] for key, figure_json in FIGURE_CACHE.items()]}
+
+def write_snapshot(version: str, path: str = SNAPSHOT_PATH) -> str:
+    """
+    Writes the snapshot of the default view, replacing it atomically
+
+    Args:
+        version (str): Data version the snapshot is built for
+        path (str): Snapshot path
+
+    Returns:
+        str: Path of the written snapshot
+    """
+    from data_store import atomic_write
+
+    snapshot = build_snapshot(version)
+    with atomic_write(path) as tmp_path, open(tmp_path, "w") as f:
+        json.dump(snapshot, f)
+    return path
+
+def _key(value):
+    return tuple(_key(item) for item in value) if isinstance(value, list) else value
+
+def load_snapshot(version: str, path: str = SNAPSHOT_PATH) -> dict | None:
+    """
+    Returns the snapshot of the default view if it was built for the current data
+
+    The figures of a snapshot are added to the figure cache when it is first read, so the
+    default view is drawn without building any figure.
+
+    Args:
+        version (str): Current data version
+        path (str): Snapshot path
+
+    Returns:
+        dict | None: Snapshot, see build_snapshot, None if it is missing or outdated
+    """
+    def loader() -> dict | None:
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return None
+        if snapshot["version"] == version:
+            for key, figure_json in snapshot["figures"]:
+                FIGURE_CACHE.put(_key(key), figure_json)
+        return snapshot
+
+    snapshot = _SNAPSHOT_CACHE.load(os.path.abspath(path), path, loader)
+    return snapshot if snapshot is not None and snapshot["version"] == version else None
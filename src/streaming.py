@@ -0,0 +1,252 @@
+import argparse
+from typing import Iterator, NamedTuple
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from columns import DIMENSIONS, INDICATORS
+from data_cleaning import MERGE_ATOL, MERGE_RTOL, RAW_PATH, MergeMismatchError, key_positions, merge, standardize
+from ingest import SheetSpec, iter_sheet
+from profiling import enable, timed
+from schemas import release_schema
+
+# generous estimates of the memory a row takes on its way from the worksheet to a joined chunk,
+# and of the memory a key remembered by join_chunks or a group of an Accumulator takes
+ROW_BYTES = 4096
+KEY_BYTES = 512
+
+# memory a streamed release may use by default, in MiB
+MEMORY_MIB = 64
+
+# values averaged into every region and the world
+ROLLUP_COLS = ["MPI"] + list(DIMENSIONS)
+
+class ChunkLimits(NamedTuple):
+    """
+    Sizes that keep a streamed release under a memory ceiling, see chunk_limits
+
+    Args:
+        chunk_rows (int): Rows per chunk of every sheet
+        max_pending (int): Most rows that may wait for their row of the other sheet
+        max_keys (int): Most keys join_chunks may remember, both sheets together
+        max_groups (int): Most groups an Accumulator may hold
+    """
+    chunk_rows: int
+    max_pending: int
+    max_keys: int
+    max_groups: int
+
+class Accumulator:
+    """
+    Population weighted sums by group, updated one chunk at a time
+
+    Only one row of sums per group is held, whatever the number of rows added.
+
+    Args:
+        columns (list): Columns averaged with population weights
+        max_groups (int | None): Most groups that may be held, unbounded if None
+    """
+    def __init__(self, columns: list, max_groups: int | None = None):
+        self.columns = columns
+        self.max_groups = max_groups
+        self.totals = {}
+
+    def add(self, groups: pd.Series, population: pd.Series, values: pd.DataFrame):
+        """
+        Adds the rows of a chunk to the sums of their groups
+
+        Args:
+            groups (pd.Series): Group of every row
+            population (pd.Series): Population of every row
+            values (pd.DataFrame): Rows holding the averaged columns
+
+        Raises:
+            MemoryError: The rows add more groups than max_groups
+        """
+        weighted = values[self.columns].mul(population, axis= 0)
+        weighted.insert(0, "Population", population)
+        weighted.insert(0, "Rows", 1)
+        sums = weighted.groupby(groups.to_numpy(), sort= False).sum()
+        for group, row in zip(sums.index, sums.to_numpy(dtype= float)):
+            total = self.totals.get(group)
+            self.totals[group] = row if total is None else total + row
+        if self.max_groups is not None and len(self.totals) > self.max_groups:
+            raise MemoryError(f"{len(self.totals)} groups are summed, more than the memory ceiling allows "
+                              f"({self.max_groups}).")
+
+    def result(self) -> pd.DataFrame:
+        """
+        Returns the totals of every group
+
+        Returns:
+            pd.DataFrame: Rows, Population and the population weighted mean of every column,
+                indexed by group
+        """
+        totals = pd.DataFrame.from_dict(self.totals, orient= "index", columns= ["Rows", "Population"] + self.columns)
+        totals[self.columns] = totals[self.columns].div(totals["Population"], axis= 0)
+        return totals.astype({"Rows": int})
+
+def chunk_limits(memory_mib: float) -> ChunkLimits:
+    """
+    Splits a memory ceiling between the rows and the keys held while a release is streamed
+
+    Half of the ceiling goes to rows: a chunk of each sheet and the rows merged from them take
+    one quarter, the rows of one sheet still waiting for their row of the other another. The
+    other half goes to what grows with the whole release rather than a chunk: the keys
+    join_chunks remembers take one quarter and the groups of an Accumulator another.
+
+    Args:
+        memory_mib (float): Memory ceiling in MiB
+
+    Returns:
+        ChunkLimits: Sizes of the chunks, pending rows, keys and groups
+    """
+    quarter = memory_mib * 1024 ** 2 / 4
+    rows = int(quarter // ROW_BYTES)
+    keys = int(quarter // KEY_BYTES)
+    return ChunkLimits(max(1, rows // 3), max(1, rows), max(1, keys), max(1, keys))
+
+def join_chunks(df1_chunks: Iterator[pd.DataFrame], df2_chunks: Iterator[pd.DataFrame], merge_on: str,
+                check_col: str, max_pending: int, max_keys: int | None = None, rtol: float = MERGE_RTOL,
+                atol: float = MERGE_ATOL) -> Iterator[pd.DataFrame]:
+    """
+    Merges two sheets while their chunks are read
+
+    Both sheets are read in lockstep and a row is merged as soon as its key was read from both,
+    so sheets listing their keys in the same order are merged one chunk at a time. Every chunk
+    is merged and checked like merge does. The keys read so far are kept to reject a key listed
+    twice, even in different chunks.
+
+    Args:
+        df1_chunks (Iterator[pd.DataFrame]): Chunks of the first sheet
+        df2_chunks (Iterator[pd.DataFrame]): Chunks of the second sheet
+        merge_on (str): Column to merge on
+        check_col (str): Column to check merge
+        max_pending (int): Most rows that may wait for their row of the other sheet
+        max_keys (int | None): Most keys that may be remembered, both sheets together,
+            unbounded if None
+        rtol (float): Relative tolerance of the check
+        atol (float): Absolute tolerance of the check
+
+    Yields:
+        pd.DataFrame: Merged rows, see merge
+
+    Raises:
+        MemoryError: More than max_pending rows wait for a match, or the sheets hold more
+            than max_keys keys
+        MergeMismatchError: A key is missing from one sheet or listed twice in one sheet, or
+            the check column differs between them
+    """
+    sources = [df1_chunks, df2_chunks]
+    pending = [None, None]
+    active = [True, True]
+    seen = [set(), set()]
+
+    while any(active):
+        for side in (0, 1):
+            chunk = next(sources[side], None) if active[side] else None
+            if chunk is None:
+                active[side] = False
+                continue
+            keys = chunk[merge_on]
+            duplicated = keys.duplicated() | keys.isin(seen[side])
+            if duplicated.any():
+                repeated = keys.loc[duplicated].drop_duplicates().astype(str)
+                raise MergeMismatchError(f"{len(repeated)} keys are listed more than once in sheet {side + 1}: "
+                                         f"{', '.join(repeated.head(10))}", repeated.to_frame())
+            seen[side].update(keys)
+            if max_keys is not None and len(seen[0]) + len(seen[1]) > max_keys:
+                raise MemoryError(f"{len(seen[0]) + len(seen[1])} keys were read, more than the memory ceiling "
+                                  f"allows ({max_keys}).")
+            pending[side] = chunk if pending[side] is None else pd.concat([pending[side], chunk], ignore_index= True)
+
+        left, right = pending
+        if left is None or right is None:
+            continue
+
+        positions = key_positions(left[merge_on], right[merge_on])
+        matched = positions >= 0
+        if matched.any():
+            rows = positions[matched]
+            yield merge(left.loc[matched], right.iloc[rows], merge_on, check_col, rtol, atol)
+
+            unmatched = np.ones(len(right), dtype= bool)
+            unmatched[rows] = False
+            pending = [left.loc[~matched].reset_index(drop= True), right.loc[unmatched].reset_index(drop= True)]
+
+        waiting = sum(len(frame) for frame in pending if frame is not None)
+        if waiting > max_pending:
+            raise MemoryError(f"{waiting} rows wait for their row of the other sheet, more than the memory "
+                              f"ceiling allows ({max_pending}). Both sheets should list their keys in the same order.")
+
+    unmatched = [frame for frame in pending if frame is not None and len(frame)]
+    if unmatched:
+        missing = pd.concat(unmatched)[merge_on].astype(str)
+        raise MergeMismatchError(f"{len(missing)} keys are missing from one of the sheets: "
+                                 f"{', '.join(missing.head(10))}", missing.to_frame())
+
+@timed("streaming.rollups")
+def stream_rollups(year: int, memory_mib: float = MEMORY_MIB) -> pd.DataFrame:
+    """
+    Computes the population weighted MPI and dimensions of every region of a release in one pass
+
+    The national and contributions sheets are read in chunks and merged, every chunk of
+    countries is standardized and added to the regional and global sums, then dropped. The
+    values match the regional outputs of get_regionals.
+
+    Args:
+        year (int): Release year
+        memory_mib (float): Memory ceiling in MiB, see chunk_limits
+
+    Returns:
+        pd.DataFrame: Rows (countries), Population and the population weighted MPI and
+            dimension values, indexed by region, "Global" included
+
+    Raises:
+        MemoryError: The release holds too many countries, or lists them in too different orders in
+            its sheets, for the memory ceiling
+        MergeMismatchError: The sheets don't hold the same countries or MPIs
+    """
+    schema = release_schema(year)
+    file_path = RAW_PATH.format(year= year)
+    limits = chunk_limits(memory_mib)
+    totals = Accumulator(ROLLUP_COLS, limits.max_groups)
+
+    workbook = load_workbook(file_path, read_only= True, data_only= True)
+    try:
+        national = (chunk.fillna(0)
+                    for chunk in iter_sheet(SheetSpec(file_path, *schema.national), limits.chunk_rows, workbook))
+        contributions = (chunk.fillna(0)
+                         for chunk in iter_sheet(SheetSpec(file_path, *schema.contributions), limits.chunk_rows, workbook))
+        for countries in join_chunks(national, contributions, "ISO Country Code", "MPI", limits.max_pending,
+                                     limits.max_keys):
+            countries = countries.rename(columns= {"MPI_x": "MPI"})
+            for x in INDICATORS:
+                standardize(countries, x)
+            for dimension, cols in DIMENSIONS.items():
+                countries[dimension] = countries[cols].sum(axis= 1)
+
+            population = countries[schema.population].astype(float)
+            totals.add(countries["Region"], population, countries)
+            totals.add(pd.Series("Global", index= countries.index), population, countries)
+    finally:
+        workbook.close()
+
+    return totals.result()
+
+def main():
+    parser = argparse.ArgumentParser(description= "Streams a release into its regional rollups under a memory ceiling")
+    parser.add_argument("--year", type= int, required= True, help= "Release year")
+    parser.add_argument("--memory-mib", type= float, default= MEMORY_MIB,
+                        help= "Memory ceiling of the rows held while streaming, in MiB")
+    parser.add_argument("--profile", nargs= "?", const= "./logs/timings.jsonl", default= None,
+                        help= "Append stage timings and memory to this JSON lines file")
+    args = parser.parse_args()
+
+    if args.profile:
+        enable(args.profile, memory= True)
+    print(stream_rollups(args.year, args.memory_mib).to_string())
+
+if __name__ == "__main__":
+    main()
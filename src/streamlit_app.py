@@ -1,36 +1,19 @@
+import os
+
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
-
-# plotting styles    
-legend_dict = dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1)
+import profiling
 
 # sidebar choices
 SECTIONS = ("Dashboard", "Overview")
-YEARS = (2020, 2021, 2022, 2023)[::-1]
-REGIONS = ("Global", "Arab States", "East Asia / Pacific",
-                        "Europe / Central Asia", "Latin America / Caribbean", "South Asia",
-                        "Sub Saharan Africa")
-
-# maps
-region_mapper = {
-    "Global": "global",
-    "Arab States": "arab_states",
-    "East Asia / Pacific": "east_asia_and_the_pacific",
-    "Europe / Central Asia": "europe_and_central_asia",
-    "Latin America / Caribbean": "latin_america_and_the_caribbean",
-    "South Asia": "south_asia",
-    "Sub Saharan Africa": "sub_saharan_africa"
-}
+
+# serve compact frames, derived columns are computed when accessed
+COMPACT = os.environ.get("MPI_COMPACT", "") not in ("", "0")
 
 st.set_page_config(page_title= "MPI", layout= "wide")
 
+# records of this rerun are kept when the session opened the performance panel
+profiling.start_run("dashboard", collect= st.session_state.get("show_perf", False))
+
 section_box = st.sidebar.selectbox("", SECTIONS)
 
 mpi_description = """
@@ -105,6 +88,17 @@ if section_box == "Overview":
     
 
 if section_box == "Dashboard":
+    # pandas, pyarrow and plotly.express are only imported by the data modules once the view
+    # isn't served from the snapshot and the figure cache
+    with profiling.startup_stage("startup.imports"):
+        from charts import import_data_stack, plotting
+        from columns import DIMENSIONS
+        from manifest import data_version
+        from snapshot import load_snapshot
+        from views import (DASHBOARD_COLS, DEFAULT_REGION, DEFAULT_YEAR, REGIONS, TOP_K, YEARS,
+                           country_comparison_figure, country_comparison_trend_figure, country_trend_figure,
+                           distribution_figure, over_time_figure, region_mapper, score_columns, score_figure)
+
     st.title("Multi-Dimensional Poverty Index Dashboard")
 
     st.sidebar.header("Choose the year and regions")
@@ -114,85 +108,106 @@ if section_box == "Dashboard":
     region_box = st.sidebar.selectbox(
         "Selected Region", REGIONS)
 
-    df = pd.read_csv(f"./data/interm/{region_mapper[region_box]}_{year_box}.csv", index_col= 0)
-
-    successful_dfs = {}
-
-    try:
-        for i, year in enumerate([year_box-1, year_box-2, year_box-3], start=1):
-            df_name = f"df_{i}"
-            file_path = f"./data/interm/{region_mapper[region_box]}_{year}.csv"
-            successful_dfs[year] = pd.read_csv(file_path, index_col=0)
-            
-
-    except Exception as e:
-        failed_years = [year_box-1, year_box-2, year_box-3]
-        for year in successful_dfs.keys():
-            failed_years.remove(year)
-        
-        if failed_years:
-            st.text(f"Missing data for year(s): {', '.join(map(str, failed_years))}")
-
-    curr_mpi_total = df["Health_w"].sum() + df["Education_w"].sum() + df["Living Standards_w"].sum()
+    st.sidebar.header("What-if weights")
+    scenario_on = st.sidebar.checkbox("Reweight the dimensions", key= "scenario")
+    if scenario_on:
+        shares = {dimension: st.sidebar.slider(dimension, 0, 100, 33, key= f"weight_{dimension}")
+                  for dimension in DIMENSIONS}
+
+    with profiling.stage("dashboard.load_snapshot"):
+        version = data_version()
+        # metrics and figures of the default view were precomputed by the pipeline
+        snapshot = (load_snapshot(version) if (region_box, year_box) == (DEFAULT_REGION, DEFAULT_YEAR) and not COMPACT
+                    else None)
+    # every other view reads the data, see charts.import_data_stack
+    if snapshot is None:
+        import_data_stack()
+
+    frames = {}
+
+    # plotly validates a figure again to draw it, see charts.plotting
+    def show_figure(figure, **kwargs):
+        with plotting():
+            st.plotly_chart(figure, **kwargs)
+
+    def region_frame():
+        if "df" not in frames:
+            with profiling.stage("dashboard.load_frame", region= region_box, year= year_box):
+                from data_store import cached_frame
+                from releases import release_frame
+
+                # zero-copy views of the memory mapped release, shared by every session and process
+                df = None if COMPACT else release_frame(region_mapper[region_box], year_box, DASHBOARD_COLS)
+                if df is None:
+                    # compact frames, and data without a release, are read from the parquet dataset
+                    df = cached_frame(region_mapper[region_box], year_box, DASHBOARD_COLS, compact_mode= COMPACT)
+            frames["df"] = df
+        return frames["df"]
+
+    if snapshot:
+        region_metrics, interval, failed_years = snapshot["metrics"], snapshot["interval"], snapshot["missing_years"]
+    else:
+        from queries import headline_metrics, missing_years, mpi_interval
+
+        region_metrics = headline_metrics(region_mapper[region_box], year_box)
+        interval = mpi_interval(region_mapper[region_box], year_box)
+        failed_years = missing_years(region_mapper[region_box], [year_box - i for i in range(1, 4)])
+
+    if failed_years:
+        st.text(f"Missing data for year(s): {', '.join(map(str, failed_years))}")
 
     st.header(f"{region_box} MPI Data ({year_box})")
     col1, col2, col3, col4 = st.columns(4)
-    try:
-        with col1:
-            prev_year_mpi_total = (successful_dfs[year_box-1]["Health_w"].sum() + 
-                                successful_dfs[year_box-1]["Education_w"].sum() + successful_dfs[year_box-1]["Living Standards_w"].sum())
-            st.metric(label= "MPI", value= round(curr_mpi_total, 3),
-                    delta = f"{round((curr_mpi_total - prev_year_mpi_total)/curr_mpi_total * 100, 1)}%", delta_color= "inverse")
-            
-        column_vals = ["Health_w", "Education_w", "Living Standards_w"]
-        for i, val in enumerate(column_vals, start=2):
-            with globals()[f"col{i}"]:
-                curr_val = df[val].sum()
-                prev_year_val = successful_dfs[year_box-1][val].sum()
-                st.metric(label= val.split("_")[0], value= round(curr_val, 3),
-                        delta = f"{round((curr_val - prev_year_val)/prev_year_val * 100, 1)}%", delta_color= "inverse")
-
-    except:
-        with col1:
-            st.metric(label= "Health", value= round(curr_mpi_total, 3))
-        
-        column_vals = ["Health_w", "Education_w", "Living Standards_w"]
-        for i, val in enumerate(column_vals):
-            with globals()[f"col{i+2}"]:
-                curr_val = df[val].sum()
-                st.metric(label= val.split("_")[0], value= round(curr_val, 3))
-
-
+    for col, dimension in zip((col1, col2, col3, col4), ["MPI", "Health", "Education", "Living Standards"]):
+        with col:
+            value, delta = region_metrics[dimension]["value"], region_metrics[dimension]["delta_pct"]
+            if delta is not None:
+                st.metric(label= dimension, value= round(value, 3),
+                        delta = f"{round(delta, 1)}%", delta_color= "inverse")
+            else:
+                st.metric(label= dimension, value= round(value, 3))
+            if dimension == "MPI" and interval:
+                bounds = f"95% CI {interval['lower']:.3f} to {interval['upper']:.3f}"
+                if interval["delta_pct_lower"] is not None:
+                    bounds += f", change {interval['delta_pct_lower']:+.1f}% to {interval['delta_pct_upper']:+.1f}%"
+                st.caption(bounds)
+
+
+    profiling.checkpoint("dashboard.metrics")
     st.divider()
-    
-    gen_colors = ["#c1b0b4", "#763028", "#2f4a5b"]    
-    all_dfs = [df]
-    all_dfs.extend(list(successful_dfs.values()))
 
-    merged_df = pd.DataFrame({"Health": [df["Health_w"].sum() for df in all_dfs],
-                        "Education": [df["Education_w"].sum() for df in all_dfs],
-                        "Living Standards":[df["Living Standards_w"].sum() for df in all_dfs],
-                        "Year":[year_box - i for i in range(len((successful_dfs.keys())) + 1)]})
+    if scenario_on:
+        import_data_stack()
+        from scenarios import dimension_weights, run_scenario
+
+        st.subheader("What-if Weighting")
+        if sum(shares.values()):
+            scenario_mpi, scenario_df = run_scenario(region_mapper[region_box], year_box, dimension_weights(shares))
+            official_mpi = region_metrics["MPI"]["value"]
+            col1, col2 = st.columns([1, 3])
+            with col1:
+                st.metric("Reweighted MPI", round(scenario_mpi, 3),
+                          f"{round((scenario_mpi / official_mpi - 1) * 100, 1)}% vs official", delta_color= "inverse")
+            with col2:
+                st.dataframe(scenario_df.head(2 * TOP_K)[["Rank", "Country", "MPI", *DIMENSIONS, "Official Rank", "Rank Change"]],
+                             hide_index= True)
+            st.caption("Countries keep the poor identified by the official 1/3 poverty cutoff, "
+                       "only the weighting of their deprivations changes.")
+        else:
+            st.markdown("Give at least one dimension a weight.")
+        profiling.checkpoint("dashboard.scenario")
+        st.divider()
 
     col1, col2 = st.columns(2)
     with col1:
         st.subheader("MPI Distribution")
-        mpi_hist = px.histogram(df, x= "MPI", nbins= 20, color_discrete_sequence= ["#2f4a5b"])
-        st.plotly_chart(mpi_hist, use_container_width= True)
+        show_figure(distribution_figure(region_box, year_box, region_frame, version), use_container_width= True)
+        profiling.checkpoint("dashboard.distribution")
         
     with col2:
         st.subheader("MPI Over Time")
-        over_time_chart = px.line(merged_df, x= "Year", y= ["Health", "Education", "Living Standards"], color_discrete_sequence= gen_colors,
-                                markers= True)
-        
-        over_time_chart.update_layout(
-            xaxis = dict(
-                tickmode = 'array',
-                tickvals = [year_box - i for i in range(len((successful_dfs.keys())) + 1)]
-            ),
-            legend= legend_dict
-        )
-        st.plotly_chart(over_time_chart, use_container_width= True)
+        show_figure(over_time_figure(region_box, year_box, version), use_container_width= True)
+        profiling.checkpoint("dashboard.over_time")
 
     st.divider()
     st.markdown("""
@@ -207,61 +222,38 @@ if section_box == "Dashboard":
     with col3:
         ls_button = st.checkbox("Living Standards", True, "ls")
 
-    if health_button or education_button or ls_button:
-        selected_cols = ["Country"]
-        col_colors = []
-        if health_button:
-            selected_cols.extend(["Nutrition", "Child Mortality"])
-            col_colors.extend(["#962c20", "#642524"])
-            
-        if education_button:
-            selected_cols.extend(["Years of Schooling", "School Attendance"])
-            col_colors.extend(["#c5a9ab", "#997a77"])
-
-        if ls_button:
-            selected_cols.extend(["Cooking Fuel", "Sanitation", "Drinking Water", "Electricity", "Housing", "Assets"])
-            col_colors.extend(["#acc6d6", "#7d9eb3", "#5d8099", "#416682", "#154b66", "#003650"])
-
-        if health_button and education_button and ls_button:
-            selected_cols = ["Country", "Health", "Education", "Living Standards"]
-            col_colors = ["#763028", "#c1b0b4", "#2f4a5b"]
-
-        sub_df = df[selected_cols]
+    selected_cols, col_colors = score_columns(health_button, education_button, ls_button)
+    selected_dims = [dimension for dimension, button in
+                     zip(["Health", "Education", "Living Standards"], [health_button, education_button, ls_button]) if button]
 
     col1, col2 = st.columns(2)
 
     try:
         with col1:
-            idx = sub_df.drop(columns="Country").sum(axis= 1).nlargest(5).index
-            idx_list = list(idx)[::-1]
-            sub_df_l = sub_df.loc[idx_list]
-            largest_chart = px.bar(sub_df_l, y= "Country", x= selected_cols, color_discrete_sequence= col_colors)
-            largest_chart.update_layout(legend= legend_dict)
-            largest_chart.update_traces(width= 0.6)
+            largest_chart = score_figure("largest", region_box, year_box, selected_dims, region_frame,
+                                         selected_cols, col_colors, version)
             
             st.markdown("#### Countries with the largest scores")
-            st.plotly_chart(largest_chart, use_container_width= True)
+            show_figure(largest_chart, use_container_width= True)
 
         with col2:
-            idx = sub_df.drop(columns="Country").sum(axis= 1).nsmallest(5).index
-            idx_list = list(idx)[::-1]
-            sub_df_s = sub_df.loc[idx_list]
-            smallest_chart = px.bar(sub_df_s, y= "Country", x= selected_cols, color_discrete_sequence= col_colors)
-            smallest_chart.update_layout(legend= legend_dict)
-            smallest_chart.update_traces(width= 0.6)
+            smallest_chart = score_figure("smallest", region_box, year_box, selected_dims, region_frame,
+                                          selected_cols, col_colors, version)
             
             st.markdown("#### Countries with the smallest scores")
-            st.plotly_chart(smallest_chart, use_container_width= True, height= 100)
+            show_figure(smallest_chart, use_container_width= True, height= 100)
         
 
-    except:
+    except ValueError:
         st.markdown("Please select a category above.")
         
+    profiling.checkpoint("dashboard.score_comparison")
     st.divider()
 
 
     st.markdown("### Country Lookup")
-    country_lookup = st.multiselect("Choose the countries and dimensions of interest", options= df["Country"], default= df["Country"].values[0])
+    countries = snapshot["countries"] if snapshot else list(region_frame()["Country"])
+    country_lookup = st.multiselect("Choose the countries and dimensions of interest", options= countries, default= countries[0])
 
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -272,75 +264,32 @@ if section_box == "Dashboard":
         ls_button = st.checkbox("Living Standards", True, "ls_2")
 
     if health_button or education_button or ls_button:
-        selected_cols = ["Country"]
-        col_colors = []
-        if health_button:
-            selected_cols.extend(["Nutrition", "Child Mortality"])
-            col_colors.extend(["#962c20", "#642524"])
-            
-        if education_button:
-            selected_cols.extend(["Years of Schooling", "School Attendance"])
-            col_colors.extend(["#c5a9ab", "#997a77"])
-
-        if ls_button:
-            selected_cols.extend(["Cooking Fuel", "Sanitation", "Drinking Water", "Electricity", "Housing", "Assets"])
-            col_colors.extend(["#acc6d6", "#7d9eb3", "#5d8099", "#416682", "#154b66", "#003650"])
-
-        if health_button and education_button and ls_button:
-            selected_cols = ["Country", "Health", "Education", "Living Standards"]
-            col_colors = ["#763028", "#c1b0b4", "#2f4a5b"]
-
-        sub_df = df[selected_cols].copy()
+        selected_cols, col_colors = score_columns(health_button, education_button, ls_button)
         
     if country_lookup:
-        country_dfs = []
-        for i, df in enumerate(all_dfs):
-            country = df.loc[df["Country"].isin(country_lookup)].copy()
-            country["Year"] = year_box - i
-            country_dfs.append(country)
-        
-        merged_countries_years_df = pd.concat(country_dfs, axis=0, ignore_index=True)
-        prev_year = merged_countries_years_df.loc[merged_countries_years_df["Year"] == year_box - 1]
-        
         if len(country_lookup) == 1:
             st.markdown("#### MPI Tracker")
-            tracker_cols = ["Country", "Health", "Education", "Living Standards"]
-            country = df[tracker_cols].loc[df[tracker_cols]["Country"].isin(country_lookup)]
-            metrics = ["MPI", "Health", "Education", "Living Standards"]
             col1, col2, col3, col4 = st.columns(4)
+
+            if snapshot and country_lookup[0] in snapshot["country_metrics"]:
+                metrics = snapshot["country_metrics"][country_lookup[0]]
+            else:
+                import_data_stack()
+                from queries import country_metrics
+
+                metrics = country_metrics(country_lookup[0], year_box)
             
-            for i, metric in enumerate(metrics, 1):
-                with globals()[f"col{i}"]:
-                    if metric == "MPI":
-                        current_val = country[metrics[1:]].sum(axis= 1).values[0]
-                        try:
-                            prev_val = prev_year[metrics[1:]].sum(axis= 1).values[0]
-                            delta = round((current_val - prev_val) / prev_val * 100, 2)
-                            st.metric(metric, round(current_val, 3), f"{delta} %", "inverse")
-                        except:
-                            st.metric(metric, round(current_val, 3))
+            for col, (metric, values) in zip((col1, col2, col3, col4), (metrics or {}).items()):
+                with col:
+                    if values["delta_pct"] is not None:
+                        st.metric(metric, round(values["value"], 3), f"{round(values['delta_pct'], 2)} %", "inverse")
                     else:
-                        current_val = country[metric].values[0]
-                        try:
-                            prev_val = prev_year[metric].values[0]
-                            delta = round((current_val - prev_val) / prev_val * 100, 2)
-                            st.metric(metric, round(current_val, 3), f"{delta} %", "inverse")
-                        except:
-                            st.metric(metric, round(current_val, 3))
+                        st.metric(metric, round(values["value"], 3))
                             
             st.markdown(f"#### MPI Over Time")
             
-            over_time_chart = px.line(merged_countries_years_df, x= "Year", y= selected_cols[1:], color_discrete_sequence= col_colors,
-                        markers= True)
-            
-            over_time_chart.update_layout(
-                xaxis = dict(
-                    tickmode = 'array',
-                    tickvals = [year_box - i for i in range(len((successful_dfs.keys())) + 1)]
-                ),
-                legend= legend_dict
-            )
-            st.plotly_chart(over_time_chart, use_container_width= True)
+            over_time_chart = country_trend_figure(year_box, country_lookup, selected_cols, col_colors, version)
+            show_figure(over_time_chart, use_container_width= True)
         
         else:
             
@@ -349,22 +298,39 @@ if section_box == "Dashboard":
             with col1:
                 st.markdown("#### MPI Over Time")
                 
-                over_time_comp_chart = px.line(merged_countries_years_df, x= "Year", y= "MPI", color= "Country", color_discrete_sequence = px.colors.qualitative.T10)
-                over_time_comp_chart.update_layout(
-                    xaxis = dict(
-                        tickmode = 'array',
-                        tickvals = [year_box - i for i in range(len((successful_dfs.keys())) + 1)]
-                    ),
-                    legend= legend_dict)
+                over_time_comp_chart = country_comparison_trend_figure(year_box, country_lookup, version)
                 
-                st.plotly_chart(over_time_comp_chart, use_container_width= True)
+                show_figure(over_time_comp_chart, use_container_width= True)
             
             with col2:
                 st.markdown("#### MPI Comparison")
 
-                comp_df = sub_df.loc[sub_df["Country"].isin(country_lookup)]
-                comp_graph =px.bar(comp_df, y= "Country", x= selected_cols, color_discrete_sequence = col_colors)
-                comp_graph.update_layout(legend= legend_dict)
-                comp_graph.update_traces(width= 0.4)
+                comp_graph = country_comparison_figure(region_box, year_box, country_lookup, region_frame,
+                                                       selected_cols, col_colors, version)
                 
-                st.plotly_chart(comp_graph, True)
\ No newline at end of file
+                show_figure(comp_graph, use_container_width= True)
+
+    profiling.checkpoint("dashboard.country_lookup")
+
+    if st.sidebar.checkbox("Show performance", key= "show_perf"):
+        import_data_stack()
+        import pandas as pd
+
+        timings = pd.DataFrame(profiling.run_records())
+        st.sidebar.markdown("#### Last rerun")
+        if not timings.empty:
+            st.sidebar.dataframe(timings[["stage", "seconds", "max_rss_mib"]], hide_index= True)
+        st.sidebar.caption(f"Total: {profiling.run_seconds() * 1000:.1f} ms")
+        startup = pd.DataFrame(profiling.startup_records())
+        if not startup.empty:
+            st.sidebar.markdown("#### Process startup")
+            st.sidebar.dataframe(startup[["stage", "seconds"]], hide_index= True)
+        if COMPACT:
+            from compact import memory_report
+
+            report = memory_report([region_frame()], DASHBOARD_COLS)
+            st.sidebar.caption(f"Frame memory: {report['compact_bytes'] / 1024:.1f} KiB instead of "
+                               f"{report['full_bytes'] / 1024:.1f} KiB, {report['saved_pct']:.0f}% saved per copy")
+
+# the first run of the process is over once its view is drawn
+profiling.finish_startup(section= section_box)
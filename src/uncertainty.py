@@ -0,0 +1,223 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data_cache import FRAME_CACHE, LRUCache
+from data_store import DATASET_DIR, atomic_write, open_dataset
+from manifest import data_version
+
+INTERVALS_PATH = "./data/processed/intervals.parquet"
+
+# resamples of the precomputed intervals, and the seed they are drawn from
+RESAMPLES = 10_000
+SEED = 0
+CONFIDENCE = 0.95
+
+# resamples drawn at once, every chunk has its own seed so the draws don't depend on the workers
+CHUNK_SIZE = 1024
+
+# intervals computed outside of the precomputed table, keyed by data version and settings
+INTERVAL_CACHE = LRUCache(8 * 1024 ** 2, sizeof= lambda intervals: intervals.memory_usage(index= True).sum())
+
+def logit_errors(mpi: np.ndarray, se: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Moves the MPI estimates and their standard errors to the logit scale
+
+    The published 95% bounds of every country are symmetric on the logit scale, with the
+    standard error scaled by the delta method. Countries with an MPI of zero or one, or no
+    standard error, keep their estimate in every resample.
+
+    Args:
+        mpi (np.ndarray): MPI of every country
+        se (np.ndarray): Standard error of every country's MPI
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Logit of the MPI and its standard error, zero where
+            the estimate is kept
+    """
+    fixed = (mpi <= 0) | (mpi >= 1) | ~(se > 0)
+    p = np.where(fixed, 0.5, mpi)
+    return np.log(p / (1 - p)), np.where(fixed, 0, se / (p * (1 - p)))
+
+def bootstrap_chunk(center: np.ndarray, scale: np.ndarray, fixed: np.ndarray, weights: np.ndarray,
+                    seed: np.random.SeedSequence, size: int) -> np.ndarray:
+    """
+    Draws resamples of every country's MPI and aggregates them for every group at once
+
+    Args:
+        center (np.ndarray): Logit of the MPI of every country, see logit_errors
+        scale (np.ndarray): Standard error on the logit scale of every country
+        fixed (np.ndarray): MPI of the countries whose estimate is kept, NaN for the others
+        weights (np.ndarray): Countries x groups matrix of population weights
+        seed (np.random.SeedSequence): Seed of the chunk
+        size (int): Number of resamples
+
+    Returns:
+        np.ndarray: Resamples x groups matrix of aggregate MPIs
+    """
+    draws = np.random.default_rng(seed).standard_normal((size, len(center)))
+    draws *= scale
+    draws += center
+    # expit, in place to keep one resamples x countries array per chunk
+    np.negative(draws, out= draws)
+    np.exp(draws, out= draws)
+    draws += 1
+    np.reciprocal(draws, out= draws)
+    np.copyto(draws, fixed, where= ~np.isnan(fixed))
+    return draws @ weights
+
+def bootstrap(mpi: np.ndarray, se: np.ndarray, weights: np.ndarray, resamples: int = RESAMPLES,
+              seed: int | list = SEED, workers: int | None = None) -> np.ndarray:
+    """
+    Parametric bootstrap of population weighted MPIs
+
+    Every resample draws each country's MPI around its estimate with its published standard
+    error, and every group's MPI is the population weighted sum of the draws. The resamples
+    are drawn in chunks of CHUNK_SIZE by a thread pool, numpy releases the GIL while drawing
+    and multiplying. Each chunk is seeded from seed and its position, so the result only
+    depends on the seed and the number of resamples.
+
+    Args:
+        mpi (np.ndarray): MPI of every country
+        se (np.ndarray): Standard error of every country's MPI
+        weights (np.ndarray): Countries x groups matrix of population weights, the weights of
+            a group sum to one over its countries and are zero elsewhere
+        resamples (int): Number of resamples
+        seed (int | list): Seed, or entropy list of a SeedSequence
+        workers (int | None): Number of threads, the number of CPUs if None
+
+    Returns:
+        np.ndarray: Resamples x groups matrix of aggregate MPIs
+    """
+    mpi, se = np.asarray(mpi, dtype= float), np.asarray(se, dtype= float)
+    center, scale = logit_errors(mpi, se)
+    fixed = np.where(scale == 0, mpi, np.nan)
+    sizes = [min(CHUNK_SIZE, resamples - start) for start in range(0, resamples, CHUNK_SIZE)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    with ThreadPoolExecutor(workers or os.cpu_count()) as executor:
+        chunks = executor.map(lambda args: bootstrap_chunk(center, scale, fixed, weights, *args), zip(seeds, sizes))
+        return np.concatenate(list(chunks)) if sizes else np.empty((0, weights.shape[1]))
+
+def group_weights(dataset_dir: str = DATASET_DIR) -> dict[int, tuple[pd.DataFrame, np.ndarray, list]]:
+    """
+    Reads the countries of every year and their population weight within every region
+
+    Args:
+        dataset_dir (str): Root directory of the dataset
+
+    Returns:
+        dict[int, tuple[pd.DataFrame, np.ndarray, list]]: Country, MPI and MPI SE of every
+            country, countries x regions weight matrix and region keys, by year
+    """
+    table = open_dataset(dataset_dir).to_table(columns= ["region", "year", "Country", "MPI", "MPI SE", "Weight"])
+    rows = table.to_pandas()
+
+    years = {}
+    for year, year_rows in rows.groupby("year", sort= True):
+        countries = (year_rows.drop_duplicates("Country")[["Country", "MPI", "MPI SE"]]
+                     .sort_values("Country").reset_index(drop= True))
+        keys = sorted(year_rows["region"].unique())
+        weights = np.zeros((len(countries), len(keys)))
+        positions = pd.Index(countries["Country"]).get_indexer(year_rows["Country"])
+        weights[positions, [keys.index(key) for key in year_rows["region"]]] = year_rows["Weight"].to_numpy(dtype= float)
+        years[int(year)] = (countries, weights, keys)
+    return years
+
+def build_intervals(dataset_dir: str = DATASET_DIR, resamples: int = RESAMPLES, seed: int = SEED,
+                    confidence: float = CONFIDENCE, workers: int | None = None) -> pd.DataFrame:
+    """
+    Computes confidence intervals of the MPI of every region and year, and of its yearly change
+
+    All regions of a year are aggregated from the same resamples. The resamples of different
+    years are drawn independently, although consecutive releases often reuse a country's
+    survey, so the intervals of the change are conservative.
+
+    Args:
+        dataset_dir (str): Root directory of the dataset
+        resamples (int): Number of resamples of every year
+        seed (int): Seed, combined with the year
+        confidence (float): Confidence level of the percentile intervals
+        workers (int | None): Number of threads drawing the resamples
+
+    Returns:
+        pd.DataFrame: Region, Year, MPI, SE, Lower, Upper, Delta % Lower and Delta % Upper
+            columns, the change bounds are missing for a region's first year
+    """
+    tails = [(1 - confidence) / 2 * 100, (1 + confidence) / 2 * 100]
+    samples, rows = {}, []
+
+    for year, (countries, weights, keys) in group_weights(dataset_dir).items():
+        draws = bootstrap(countries["MPI"], countries["MPI SE"], weights, resamples, [seed, year], workers)
+        lower, upper = np.percentile(draws, tails, axis= 0)
+        estimates = countries["MPI"].to_numpy(dtype= float) @ weights
+        for i, key in enumerate(keys):
+            samples[(key, year)] = draws[:, i]
+            previous = samples.get((key, year - 1))
+            delta = ([np.nan, np.nan] if previous is None
+                     else np.percentile((draws[:, i] / previous - 1) * 100, tails))
+            rows.append((key, year, estimates[i], draws[:, i].std(ddof= 1), lower[i], upper[i], *delta))
+
+    columns = ["Region", "Year", "MPI", "SE", "Lower", "Upper", "Delta % Lower", "Delta % Upper"]
+    return pd.DataFrame(rows, columns= columns).sort_values(["Region", "Year"], ignore_index= True)
+
+def write_intervals(intervals: pd.DataFrame, path: str = INTERVALS_PATH) -> str:
+    """
+    Writes the intervals atomically
+
+    Args:
+        intervals (pd.DataFrame): Intervals created by build_intervals
+        path (str): Output path
+
+    Returns:
+        str: Path of the written file
+    """
+    with atomic_write(path) as tmp_path:
+        pq.write_table(pa.Table.from_pandas(intervals, preserve_index= False), tmp_path)
+    return path
+
+def load_intervals(path: str = INTERVALS_PATH) -> pd.DataFrame:
+    """
+    Reads the precomputed intervals through the process wide cache, indexed by (Region, Year)
+
+    Args:
+        path (str): Path of the intervals
+
+    Returns:
+        pd.DataFrame: Indexed intervals
+    """
+    def loader() -> pd.DataFrame:
+        return pd.read_parquet(path).set_index(["Region", "Year"]).sort_index()
+
+    return FRAME_CACHE.load(("intervals", os.path.abspath(path)), path, loader)
+
+def intervals(resamples: int = RESAMPLES, seed: int = SEED, confidence: float = CONFIDENCE,
+              dataset_dir: str = DATASET_DIR) -> pd.DataFrame:
+    """
+    Returns the intervals of every region and year for any settings
+
+    The precomputed table is returned for the default settings, other settings are computed
+    once per data version.
+
+    Args:
+        resamples (int): Number of resamples of every year
+        seed (int): Seed
+        confidence (float): Confidence level
+        dataset_dir (str): Root directory of the dataset
+
+    Returns:
+        pd.DataFrame: Intervals indexed by (Region, Year), see build_intervals
+    """
+    if (resamples, seed, confidence, dataset_dir) == (RESAMPLES, SEED, CONFIDENCE, DATASET_DIR):
+        return load_intervals()
+
+    cache_key = (data_version(), resamples, seed, confidence, os.path.abspath(dataset_dir))
+    result = INTERVAL_CACHE.get(cache_key)
+    if result is None:
+        result = build_intervals(dataset_dir, resamples, seed, confidence).set_index(["Region", "Year"]).sort_index()
+        INTERVAL_CACHE.put(cache_key, result)
+    return result
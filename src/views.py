@@ -0,0 +1,202 @@
+from typing import TYPE_CHECKING, Callable
+
+import plotly.graph_objects as go
+
+from charts import (DIMENSION_COLORS, cached_figure, comparison_trend_chart, distribution_chart,
+                    score_chart, trend_chart)
+from columns import DIMENSIONS
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# figures of the dashboard, shared with the pipeline so the snapshot of the default view holds
+# the exact figures and cache keys the dashboard asks for. Data modules are imported by the
+# builders, which only run when a figure is not cached.
+
+# sidebar choices
+YEARS = (2020, 2021, 2022, 2023)[::-1]
+REGIONS = ("Global", "Arab States", "East Asia / Pacific",
+                        "Europe / Central Asia", "Latin America / Caribbean", "South Asia",
+                        "Sub Saharan Africa")
+
+# maps
+region_mapper = {
+    "Global": "global",
+    "Arab States": "arab_states",
+    "East Asia / Pacific": "east_asia_and_the_pacific",
+    "Europe / Central Asia": "europe_and_central_asia",
+    "Latin America / Caribbean": "latin_america_and_the_caribbean",
+    "South Asia": "south_asia",
+    "Sub Saharan Africa": "sub_saharan_africa"
+}
+
+# view a new session opens on
+DEFAULT_REGION = REGIONS[0]
+DEFAULT_YEAR = YEARS[0]
+
+# countries shown in the largest/smallest score charts
+TOP_K = 5
+
+# columns drawn by the dashboard, only these are decoded from the dataset
+DASHBOARD_COLS = ["Country", "MPI", "Nutrition", "Child Mortality", "Years of Schooling",
+                  "School Attendance", "Cooking Fuel", "Sanitation", "Drinking Water",
+                  "Electricity", "Housing", "Assets", "Health", "Education", "Living Standards",
+                  "Health_w", "Education_w", "Living Standards_w"]
+
+def score_columns(health: bool, education: bool, living_standards: bool) -> tuple[list, list]:
+    """
+    Returns the columns and colors of the score charts for the checked dimensions
+
+    Args:
+        health (bool): Health is checked
+        education (bool): Education is checked
+        living_standards (bool): Living Standards is checked
+
+    Returns:
+        tuple[list, list]: Country followed by the stacked columns, and their colors
+    """
+    if health and education and living_standards:
+        return ["Country", "Health", "Education", "Living Standards"], ["#763028", "#c1b0b4", "#2f4a5b"]
+
+    selected_cols = ["Country"]
+    col_colors = []
+    if health:
+        selected_cols.extend(["Nutrition", "Child Mortality"])
+        col_colors.extend(["#962c20", "#642524"])
+
+    if education:
+        selected_cols.extend(["Years of Schooling", "School Attendance"])
+        col_colors.extend(["#c5a9ab", "#997a77"])
+
+    if living_standards:
+        selected_cols.extend(["Cooking Fuel", "Sanitation", "Drinking Water", "Electricity", "Housing", "Assets"])
+        col_colors.extend(["#acc6d6", "#7d9eb3", "#5d8099", "#416682", "#154b66", "#003650"])
+    return selected_cols, col_colors
+
+def distribution_figure(region: str, year: int, frame: Callable[[], "pd.DataFrame"], version: str) -> go.Figure:
+    """
+    Histogram of the MPI of a region's countries
+
+    Args:
+        region (str): Region label, e.g. "Global"
+        year (int): Year
+        frame (Callable[[], pd.DataFrame]): Returns the regional DataFrame
+        version (str): Data version
+
+    Returns:
+        go.Figure: Figure
+    """
+    return cached_figure(("distribution", region, year, version), lambda: distribution_chart(frame()[["MPI"]]))
+
+def over_time_figure(region: str, year: int, version: str) -> go.Figure:
+    """
+    Dimension values of a region over the four years up to year
+
+    Args:
+        region (str): Region label, e.g. "Global"
+        year (int): Last year
+        version (str): Data version
+
+    Returns:
+        go.Figure: Figure
+    """
+    def build() -> go.Figure:
+        from aggregates import load_cube, over_time
+
+        window = [year - i for i in range(4)]
+        return trend_chart(over_time(load_cube(), region_mapper[region], window), list(DIMENSIONS), DIMENSION_COLORS)
+
+    return cached_figure(("over_time", region, year, version), build)
+
+def score_figure(order: str, region: str, year: int, dimensions: list, frame: Callable[[], "pd.DataFrame"],
+                 selected_cols: list, col_colors: list, version: str) -> go.Figure:
+    """
+    Scores of the TOP_K largest or smallest scoring countries of a region
+
+    Args:
+        order (str): "largest" or "smallest"
+        region (str): Region label, e.g. "Global"
+        year (int): Year
+        dimensions (list): Checked dimensions, at least one
+        frame (Callable[[], pd.DataFrame]): Returns the regional DataFrame
+        selected_cols (list): Columns of the chart, see score_columns
+        col_colors (list): Colors of the columns
+        version (str): Data version
+
+    Returns:
+        go.Figure: Figure
+
+    Raises:
+        ValueError: No dimension is checked
+    """
+    def build() -> go.Figure:
+        from queries import top_countries
+
+        rows = [row["row"] for row in top_countries(region_mapper[region], year, dimensions, order, TOP_K)][::-1]
+        return score_chart(frame()[selected_cols].iloc[rows], selected_cols, col_colors)
+
+    return cached_figure((order, region, year, tuple(dimensions), TOP_K, version), build)
+
+def country_trend_figure(year: int, countries: list, selected_cols: list, col_colors: list, version: str) -> go.Figure:
+    """
+    Scores of one country over the four years up to year
+
+    Args:
+        year (int): Last year
+        countries (list): The country, as a one element list
+        selected_cols (list): Columns of the chart, see score_columns
+        col_colors (list): Colors of the columns
+        version (str): Data version
+
+    Returns:
+        go.Figure: Figure
+    """
+    def build() -> go.Figure:
+        from countries import country_history, load_country_index
+
+        history = country_history(load_country_index(), countries, year - 3, year)
+        return trend_chart(history, selected_cols[1:], col_colors)
+
+    return cached_figure(("country_trend", year, tuple(countries), tuple(selected_cols), version), build)
+
+def country_comparison_trend_figure(year: int, countries: list, version: str) -> go.Figure:
+    """
+    MPI of several countries over the four years up to year
+
+    Args:
+        year (int): Last year
+        countries (list): Countries to compare
+        version (str): Data version
+
+    Returns:
+        go.Figure: Figure
+    """
+    def build() -> go.Figure:
+        from countries import country_history, load_country_index
+
+        return comparison_trend_chart(country_history(load_country_index(), countries, year - 3, year))
+
+    return cached_figure(("country_comparison_trend", year, tuple(countries), version), build)
+
+def country_comparison_figure(region: str, year: int, countries: list, frame: Callable[[], "pd.DataFrame"],
+                              selected_cols: list, col_colors: list, version: str) -> go.Figure:
+    """
+    Scores of several countries of a region side by side
+
+    Args:
+        region (str): Region label, e.g. "Global"
+        year (int): Year
+        countries (list): Countries to compare
+        frame (Callable[[], pd.DataFrame]): Returns the regional DataFrame
+        selected_cols (list): Columns of the chart, see score_columns
+        col_colors (list): Colors of the columns
+        version (str): Data version
+
+    Returns:
+        go.Figure: Figure
+    """
+    def build() -> go.Figure:
+        sub_df = frame()[selected_cols]
+        return score_chart(sub_df.loc[sub_df["Country"].isin(countries)], selected_cols, col_colors, 0.4)
+
+    return cached_figure(("country_comparison", region, year, tuple(countries), tuple(selected_cols), version), build)
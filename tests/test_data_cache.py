@@ -0,0 +1,99 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import data_cache
+from data_cache import FileCache, LRUCache
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_bytes= 3, sizeof= lambda value: 1)
+    for key in "abc":
+        cache.put(key, key)
+    cache.get("a")
+    cache.put("d", "d")
+
+    assert "b" not in cache
+    assert [key for key, _ in cache.items()] == ["c", "a", "d"]
+    assert cache.nbytes == 3
+
+def test_lru_skips_values_larger_than_max_bytes():
+    cache = LRUCache(max_bytes= 10, sizeof= len)
+    cache.put("small", "abc")
+    cache.put("large", "x" * 11)
+
+    assert "large" not in cache
+    assert cache.get("small") == "abc"
+    assert cache.nbytes == 3
+
+def test_lru_put_replaces_size_of_existing_key():
+    cache = LRUCache(max_bytes= 10, sizeof= len)
+    cache.put("key", "abcd")
+    cache.put("key", "ab")
+
+    assert cache.nbytes == 2
+    assert len(cache) == 1
+
+def test_file_cache_reloads_changed_file(tmp_path):
+    path = tmp_path / "value.txt"
+    path.write_text("first")
+    cache = FileCache(revalidate_after= 0, sizeof= len)
+
+    assert cache.load("key", str(path), path.read_text) == "first"
+    path.write_text("second!")
+    assert cache.load("key", str(path), path.read_text) == "second!"
+
+def test_file_cache_skips_value_of_file_replaced_while_loading(tmp_path):
+    path = tmp_path / "value.txt"
+    path.write_text("old")
+    cache = FileCache(revalidate_after= 60, sizeof= len)
+
+    def loader() -> str:
+        value = path.read_text()
+        replacement = tmp_path / "replacement.txt"
+        replacement.write_text("newer")
+        os.replace(replacement, path)
+        return value
+
+    assert cache.load("key", str(path), loader) == "old"
+    assert "key" not in cache
+    assert cache.load("key", str(path), path.read_text) == "newer"
+
+def test_file_cache_shares_concurrent_loads(tmp_path):
+    path = tmp_path / "value.txt"
+    path.write_text("value")
+    cache = FileCache(revalidate_after= 60, sizeof= len)
+    calls, release = [], threading.Event()
+
+    def loader() -> str:
+        calls.append(1)
+        release.wait(5)
+        return path.read_text()
+
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(cache.load, "key", str(path), loader) for _ in range(8)]
+        release.set()
+        values = [future.result() for future in futures]
+
+    assert values == ["value"] * 8
+    assert len(calls) == 1
+
+def test_file_cache_hashes_files_only_once_their_state_changed(tmp_path, monkeypatch):
+    path = tmp_path / "value.txt"
+    path.write_text("value")
+    cache = FileCache(revalidate_after= 0, sizeof= len)
+    hashed, loaded = [], []
+    monkeypatch.setattr(data_cache, "file_digest", lambda file: hashed.append(file) or "digest")
+
+    def loader() -> str:
+        loaded.append(1)
+        return path.read_text()
+
+    cache.load("key", str(path), loader)
+    cache.load("key", str(path), loader)
+    assert (len(hashed), len(loaded)) == (0, 1)
+
+    # the first change is hashed and reloaded, later touches of the same content only hashed
+    for mtime in (1_000_000, 2_000_000):
+        os.utime(path, (mtime, mtime))
+        assert cache.load("key", str(path), loader) == "value"
+    assert (len(hashed), len(loaded)) == (2, 2)
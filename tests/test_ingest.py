@@ -0,0 +1,13 @@
+import ingest
+from ingest import SheetSpec, sheet_cache_path
+
+SPEC = SheetSpec("book.xlsx", "Sheet", 1, {"A": "ISO", "B": "MPI"})
+
+def test_sheet_cache_path_changes_with_workbook_spec_and_parser(monkeypatch):
+    path = sheet_cache_path(SPEC, "digest")
+
+    assert sheet_cache_path(SPEC, "digest") == path
+    assert sheet_cache_path(SPEC, "other") != path
+    assert sheet_cache_path(SPEC._replace(header_rows= 2), "digest") != path
+    monkeypatch.setattr(ingest, "PARSER_VERSION", ingest.PARSER_VERSION + "+1")
+    assert sheet_cache_path(SPEC, "digest") != path
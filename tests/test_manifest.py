@@ -0,0 +1,43 @@
+from data_cache import file_digest
+from manifest import load_manifest, record_year, stale_regions
+
+def _built(tmp_path, input_digest: str = "input") -> tuple[dict, dict]:
+    paths = {}
+    for region in ("global", "south_asia"):
+        path = tmp_path / f"{region}_2023.csv"
+        path.write_text(region)
+        paths[region] = str(path)
+
+    manifest = load_manifest(str(tmp_path / "manifest.json"))
+    outputs = {region: {path: file_digest(path)} for region, path in paths.items()}
+    record_year(manifest, 2023, "workbook.xlsx", input_digest, outputs)
+    return manifest, paths
+
+def test_unchanged_year_has_no_stale_regions(tmp_path):
+    manifest, _ = _built(tmp_path)
+
+    assert stale_regions(manifest, 2023, "input") == []
+
+def test_changed_workbook_rebuilds_every_region(tmp_path):
+    manifest, _ = _built(tmp_path)
+
+    assert stale_regions(manifest, 2023, "changed") is None
+
+def test_year_never_built_rebuilds_every_region(tmp_path):
+    manifest, _ = _built(tmp_path)
+
+    assert stale_regions(manifest, 2022, "input") is None
+
+def test_modified_or_deleted_output_is_stale(tmp_path):
+    manifest, paths = _built(tmp_path)
+    with open(paths["global"], "a") as f:
+        f.write("edited")
+    assert stale_regions(manifest, 2023, "input") == ["global"]
+
+    (tmp_path / "south_asia_2023.csv").unlink()
+    assert stale_regions(manifest, 2023, "input") == ["global", "south_asia"]
+
+def test_outputs_of_other_compact_mode_are_stale(tmp_path):
+    manifest, _ = _built(tmp_path)
+
+    assert stale_regions(manifest, 2023, "input", compact_mode= True) is None
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_cleaning import MergeMismatchError, key_positions, merge
+
+def _sheets() -> tuple[pd.DataFrame, pd.DataFrame]:
+    national = pd.DataFrame({"ISO": ["AFG", "BGD", "COL"], "Country": ["Afghanistan", "Bangladesh", "Colombia"],
+                             "MPI": [0.27, 0.104, 0.02]})
+    contributions = pd.DataFrame({"ISO": ["COL", "AFG", "BGD"], "MPI": [0.02, 0.27, 0.104],
+                                  "Nutrition": [10.0, 20.0, 30.0]})
+    return national, contributions
+
+def test_key_positions_marks_missing_keys():
+    positions = key_positions(pd.Series(["b", "x", "a"]), pd.Series(["a", "b", "c"], name= "ISO"))
+
+    np.testing.assert_array_equal(positions, [1, -1, 0])
+
+def test_key_positions_rejects_duplicated_right_keys():
+    with pytest.raises(ValueError, match= "Duplicated values in the 'ISO' column: a"):
+        key_positions(pd.Series(["a"]), pd.Series(["a", "b", "a"], name= "ISO"))
+
+def test_merge_joins_rows_in_left_order():
+    national, contributions = _sheets()
+    merged = merge(national, contributions, "ISO", "MPI")
+
+    assert list(merged.columns) == ["ISO", "Country", "MPI_x", "MPI_y", "Nutrition"]
+    assert list(merged["Country"]) == ["Afghanistan", "Bangladesh", "Colombia"]
+    assert list(merged["Nutrition"]) == [20.0, 30.0, 10.0]
+
+def test_merge_accepts_differences_within_tolerance():
+    national, contributions = _sheets()
+    contributions.loc[0, "MPI"] += 1e-10
+
+    assert len(merge(national, contributions, "ISO", "MPI")) == 3
+
+def test_merge_raises_on_missing_key():
+    national, contributions = _sheets()
+    contributions = contributions[contributions["ISO"] != "BGD"]
+
+    with pytest.raises(MergeMismatchError, match= "1 of 3 rows \\(1 without a match\\)") as error:
+        merge(national, contributions, "ISO", "MPI")
+    assert list(error.value.mismatches["ISO"]) == ["BGD"]
+
+def test_merge_raises_on_mpi_out_of_tolerance():
+    national, contributions = _sheets()
+    contributions.loc[contributions["ISO"] == "COL", "MPI"] = 0.021
+
+    with pytest.raises(MergeMismatchError, match= "1 of 3 rows \\(0 without a match\\)") as error:
+        merge(national, contributions, "ISO", "MPI")
+    mismatches = error.value.mismatches
+    assert list(mismatches["ISO"]) == ["COL"]
+    assert mismatches["Difference"].iloc[0] == pytest.approx(0.001)
@@ -0,0 +1,19 @@
+import json
+
+import profiling
+
+def test_finish_startup_logs_to_the_profile_sink(tmp_path, monkeypatch, capsys):
+    log_path = tmp_path / "timings.jsonl"
+    monkeypatch.setattr(profiling, "_startup", {"records": [], "finished": False})
+    monkeypatch.setattr(profiling, "_settings", {"enabled": True, "log_path": str(log_path)})
+
+    with profiling.startup_stage("startup.imports"):
+        pass
+    assert profiling.finish_startup(section= "Overview")
+    assert not profiling.finish_startup()
+
+    records = [json.loads(line) for line in log_path.read_text().splitlines()]
+    assert [record["stage"] for record in records] == ["startup.imports", "startup.since_launch"]
+    assert {record["run"] for record in records} == {"startup"}
+    assert records[1]["section"] == "Overview"
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,44 @@
+import pandas as pd
+
+from columns import DIMENSIONS, INDICATORS
+from data_store import write_partition
+from rankings import build_rankings, load_rankings, top_k, write_rankings
+
+def _partition(scores: dict[str, float]) -> pd.DataFrame:
+    # every score sits in the first health indicator, so each combination including Health ranks alike
+    df = pd.DataFrame({"Country": list(scores), **{col: 0.0 for col in INDICATORS}})
+    df[DIMENSIONS["Health"][0]] = list(scores.values())
+    for dimension, cols in DIMENSIONS.items():
+        df[dimension] = df[cols].sum(axis= 1)
+    return df
+
+def _rankings(tmp_path, k: int = 3) -> pd.DataFrame:
+    dataset_dir = str(tmp_path / "mpi")
+    write_partition(_partition({"A": 0.3, "B": 0.5, "C": 0.3, "D": 0.1}), "Global", 2023, dataset_dir)
+    write_partition(_partition({"B": 0.5, "C": 0.3}), "South Asia", 2023, dataset_dir)
+    return load_rankings(write_rankings(build_rankings(dataset_dir, k), str(tmp_path / "rankings.parquet")))
+
+def test_top_k_breaks_ties_in_dataset_order(tmp_path):
+    rankings = _rankings(tmp_path)
+
+    largest = top_k(rankings, "global", 2023, ["Health"], "largest", 3)
+    smallest = top_k(rankings, "global", 2023, ["Health"], "smallest", 3)
+
+    assert list(largest["Country"]) == ["B", "A", "C"]
+    assert list(largest["Rank"]) == [1, 2, 3]
+    assert list(smallest["Country"]) == ["D", "A", "C"]
+
+def test_top_k_returns_partial_partitions_whole(tmp_path):
+    rankings = _rankings(tmp_path)
+
+    largest = top_k(rankings, "south_asia", 2023, ["Health", "Education", "Living Standards"], "largest", 5)
+
+    assert list(largest["Country"]) == ["B", "C"]
+    assert list(largest["Score"]) == [0.5, 0.3]
+    assert list(largest["Row"]) == [0, 1]
+
+def test_top_k_keeps_at_most_the_built_k(tmp_path):
+    rankings = _rankings(tmp_path, k= 2)
+
+    assert list(top_k(rankings, "global", 2023, ["Health", "Education"], "largest", 5)["Country"]) == ["B", "A"]
+    assert top_k(rankings, "global", 2023, ["Education"], "largest", 5)["Score"].eq(0).all()
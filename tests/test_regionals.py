@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from columns import DIMENSIONS, INDICATORS
+from compact import expand
+from data_cleaning import get_regionals
+
+def _year_dfs() -> dict[int, pd.DataFrame]:
+    rng = np.random.default_rng(0)
+    dfs = {}
+    for year, n in ((2022, 5), (2023, 7)):
+        df = pd.DataFrame({"Country": [f"Country {i}" for i in range(n)], "MPI": rng.uniform(0, 0.5, n),
+                           "MPI SE": rng.uniform(0, 0.02, n), "Intensity": rng.uniform(30, 60, n),
+                           f"Population {year - 2}": rng.uniform(1, 100, n),
+                           "Region": ["South Asia", "Arab States"] * (n // 2) + ["South Asia"] * (n % 2)})
+        for col in INDICATORS:
+            df[col] = rng.uniform(0, 0.05, n)
+        dfs[year] = df
+    return dfs
+
+def _expected(df: pd.DataFrame, year: int) -> pd.DataFrame:
+    # the per region computation the vectorized pass replaced
+    df = df.copy()
+    population = df[f"Population {year - 2}"]
+    df["Weight"] = population / population.sum()
+    for col in INDICATORS:
+        df[f"{col}_w"] = df[col] * df["Weight"]
+    for suffix in ("", "_w"):
+        for dimension, cols in DIMENSIONS.items():
+            df[dimension + suffix] = df[[col + suffix for col in cols]].sum(axis= 1)
+    return df
+
+def test_regionals_match_the_per_region_computation():
+    dfs = _year_dfs()
+    regionals = get_regionals([2022, 2023], dfs)
+
+    assert set(regionals) == {(region, year) for year in dfs for region in ["South Asia", "Arab States", "Global"]}
+    for (region, year), region_df in regionals.items():
+        rows = dfs[year] if region == "Global" else dfs[year].loc[dfs[year]["Region"] == region].drop(columns= "Region")
+        expected = _expected(rows, year)
+
+        assert list(region_df["Country"]) == list(expected["Country"])
+        assert region_df["Weight"].sum() == pytest.approx(1)
+        np.testing.assert_array_equal(region_df["Weight"], expected["Weight"])
+        pd.testing.assert_frame_equal(region_df[list(expected.columns)], expected, check_exact= False, rtol= 1e-15)
+
+def test_compact_regionals_expand_to_the_full_ones():
+    dfs = _year_dfs()
+    full = get_regionals([2022, 2023], dfs)
+    compact = get_regionals([2022, 2023], dfs, compact_mode= True)
+
+    assert set(compact) == set(full)
+    for key, region_df in compact.items():
+        expanded = expand(region_df)
+        assert set(expanded.columns) == set(full[key].columns)
+        pd.testing.assert_frame_equal(expanded[list(full[key].columns)], full[key], check_exact= False, rtol= 1e-6)
@@ -0,0 +1,49 @@
+import gc
+import os
+import weakref
+
+import pandas as pd
+
+import releases
+from data_store import write_partition
+from releases import KEEP_RELEASES, current_release, history_path, publish_release, release_frame
+
+def _publish(tmp_path, versions: list[str]) -> str:
+    dataset_dir, releases_dir = str(tmp_path / "mpi"), str(tmp_path / "releases")
+    os.makedirs(releases_dir, exist_ok= True)
+    write_partition(pd.DataFrame({"Country": ["A", "B"], "MPI": [0.1, 0.2]}), "Global", 2023, dataset_dir)
+    for version in versions:
+        publish_release(version, dataset_dir, releases_dir)
+    return releases_dir
+
+def test_publish_release_prunes_in_publish_order(tmp_path):
+    versions = [f"v{i}" for i in range(KEEP_RELEASES + 2)]
+    releases_dir = _publish(tmp_path, versions)
+    # the oldest kept release is touched last, an mtime order would remove it instead of v0
+    os.utime(os.path.join(releases_dir, "v1.arrow"))
+    releases_dir = _publish(tmp_path, ["v9"])
+
+    kept = versions[2:] + ["v9"]
+    assert sorted(name for name in os.listdir(releases_dir) if name.endswith(".arrow")) == \
+        sorted(f"{version}.arrow" for version in kept)
+    with open(history_path(releases_dir)) as f:
+        assert f.read().split() == [f"{version}.arrow" for version in kept]
+
+def test_publish_release_moves_a_republished_release_last(tmp_path):
+    releases_dir = _publish(tmp_path, ["v0", "v1", "v2", "v0", "v3"])
+
+    with open(history_path(releases_dir)) as f:
+        assert f.read().split() == ["v2.arrow", "v0.arrow", "v3.arrow"]
+
+def test_current_release_drops_the_replaced_release(tmp_path, monkeypatch):
+    monkeypatch.setattr(releases._RELEASE_CACHE, "revalidate_after", 0)
+    releases_dir = _publish(tmp_path, ["v0"])
+    old = weakref.ref(current_release(releases_dir)[0])
+    assert list(release_frame("global", 2023, ["Country"], releases_dir)["Country"]) == ["A", "B"]
+
+    _publish(tmp_path, ["v1"])
+    reader, _ = current_release(releases_dir)
+    gc.collect()
+
+    assert old() is None
+    assert current_release(releases_dir)[0] is reader
@@ -0,0 +1,48 @@
+import os
+
+import numpy as np
+import pytest
+
+from columns import DIMENSIONS, INDICATORS
+from data_store import cached_frame
+from scenarios import OFFICIAL_WEIGHTS, SCENARIO_COLS, apply_weights, dimension_weights, to_matrix
+
+DATASET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "processed", "mpi")
+
+PARTITIONS = sorted((region.split("=")[1], int(year.split("=")[1]))
+                    for region in os.listdir(DATASET_DIR)
+                    for year in os.listdir(os.path.join(DATASET_DIR, region)))
+
+def test_equal_dimension_shares_give_the_official_weights():
+    np.testing.assert_allclose(dimension_weights({dimension: 2 for dimension in DIMENSIONS}), OFFICIAL_WEIGHTS)
+
+def test_dimension_weights_split_a_share_between_its_indicators():
+    weights = dict(zip(INDICATORS, dimension_weights({"Health": 1})))
+
+    assert [weights[col] for col in DIMENSIONS["Health"]] == [0.5, 0.5]
+    assert sum(weights.values()) == pytest.approx(1)
+
+@pytest.mark.parametrize("shares", [{"Health": -1, "Education": 2}, {}])
+def test_dimension_weights_reject_invalid_shares(shares: dict):
+    with pytest.raises(ValueError):
+        dimension_weights(shares)
+
+@pytest.mark.parametrize("key, year", PARTITIONS)
+def test_official_weights_reproduce_the_published_mpi(key: str, year: int):
+    df = cached_frame(key, year, SCENARIO_COLS + ["MPI"], DATASET_DIR)
+    regional, result = apply_weights(to_matrix(df), OFFICIAL_WEIGHTS)
+
+    # the contributions of the older releases are published as rounded percentages
+    recomputed = result.set_index("Country")["MPI"].reindex(df["Country"]).to_numpy()
+    np.testing.assert_allclose(recomputed, df["MPI"], rtol= 1e-6, atol= 1e-12)
+    assert regional == pytest.approx((df["MPI"] * df["Weight"]).sum(), rel= 1e-6)
+    assert (result["Rank Change"] == 0).all()
+
+def test_reweighting_reranks_countries():
+    df = cached_frame("global", 2023, SCENARIO_COLS, DATASET_DIR)
+    _, result = apply_weights(to_matrix(df), dimension_weights({"Health": 1}))
+
+    np.testing.assert_allclose(result["MPI"], result["Health"])
+    assert (result["Rank Change"] != 0).any()
+    assert (result["Rank Change"] == result["Official Rank"] - result["Rank"]).all()
+    assert result["MPI"].is_monotonic_decreasing
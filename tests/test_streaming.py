@@ -0,0 +1,117 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from data_cleaning import MergeMismatchError, gather_dfs, get_regionals
+from ingest import SheetSpec, iter_sheet
+from streaming import Accumulator, chunk_limits, join_chunks, stream_rollups
+
+# the raw workbooks are read relative to the repository root, like the pipeline does
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _sheets(keys: list[str]) -> tuple[pd.DataFrame, pd.DataFrame]:
+    mpi = [0.1 * (i + 1) for i in range(len(keys))]
+    national = pd.DataFrame({"ISO": keys, "Country": [f"Country {key}" for key in keys], "MPI": mpi})
+    contributions = pd.DataFrame({"ISO": keys, "MPI": mpi, "Nutrition": 10.0})
+    return national, contributions
+
+def _chunks(df: pd.DataFrame, rows: int) -> iter:
+    return (df.iloc[i:i + rows] for i in range(0, len(df), rows))
+
+def test_iter_sheet_reads_chunks_until_the_first_empty_row(tmp_path):
+    path = str(tmp_path / "sheet.xlsx")
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Title"])
+    for row in [["AFG", 0.27, "x"], ["BGD", 0.104, "y"], ["COL", 2.0, "z"], [None], ["Note", None, None]]:
+        sheet.append(row)
+    workbook.save(path)
+
+    chunks = list(iter_sheet(SheetSpec(path, sheet.title, 1, {"A": "ISO", "B": "MPI"}), 2))
+
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert list(pd.concat(chunks)["ISO"]) == ["AFG", "BGD", "COL"]
+    assert list(chunks[1]["MPI"]) == [2]
+
+def test_accumulator_sums_groups_across_chunks():
+    values = pd.DataFrame({"Group": ["a", "b", "a", "a"], "Population": [1.0, 2.0, 3.0, 4.0],
+                           "MPI": [0.1, 0.2, 0.3, 0.4]})
+    totals = Accumulator(["MPI"])
+    for chunk in _chunks(values, 3):
+        totals.add(chunk["Group"], chunk["Population"], chunk)
+    result = totals.result()
+
+    assert result.loc["a", "Rows"] == 3
+    assert result.loc["a", "Population"] == 8.0
+    assert result.loc["a", "MPI"] == pytest.approx((0.1 + 0.9 + 1.6) / 8)
+    assert result.loc["b", "MPI"] == pytest.approx(0.2)
+
+def test_accumulator_raises_past_max_groups():
+    values = pd.DataFrame({"Group": ["a", "b", "c"], "Population": 1.0, "MPI": 0.1})
+    totals = Accumulator(["MPI"], max_groups= 2)
+    with pytest.raises(MemoryError):
+        totals.add(values["Group"], values["Population"], values)
+
+def test_chunk_limits_shrink_with_the_ceiling():
+    small, large = chunk_limits(1), chunk_limits(64)
+
+    assert all(0 < a < b for a, b in zip(small, large))
+    assert small.chunk_rows * 3 <= small.max_pending
+
+def test_join_chunks_merges_rows_across_chunks():
+    national, contributions = _sheets(["AFG", "BGD", "COL", "DZA"])
+    joined = pd.concat(join_chunks(_chunks(national, 2), _chunks(contributions.iloc[::-1], 2), "ISO", "MPI",
+                                   max_pending= 4))
+
+    assert sorted(joined["ISO"]) == ["AFG", "BGD", "COL", "DZA"]
+    assert list(joined.columns) == ["ISO", "Country", "MPI_x", "MPI_y", "Nutrition"]
+
+def test_join_chunks_raises_on_missing_key():
+    national, contributions = _sheets(["AFG", "BGD", "COL"])
+    with pytest.raises(MergeMismatchError, match= "1 keys are missing from one of the sheets: COL"):
+        list(join_chunks(_chunks(national, 2), _chunks(contributions.iloc[:2], 2), "ISO", "MPI", max_pending= 4))
+
+def test_join_chunks_raises_on_mismatching_values():
+    national, contributions = _sheets(["AFG", "BGD", "COL"])
+    contributions.loc[1, "MPI"] += 0.01
+    with pytest.raises(MergeMismatchError, match= "Values in the 'MPI' column do not match"):
+        list(join_chunks(_chunks(national, 2), _chunks(contributions, 2), "ISO", "MPI", max_pending= 4))
+
+@pytest.mark.parametrize("side", [1, 2])
+@pytest.mark.parametrize("rows", [1, 3])
+def test_join_chunks_rejects_duplicated_keys(side: int, rows: int):
+    sheets = list(_sheets(["AFG", "BGD", "COL"]))
+    sheets[side - 1] = sheets[side - 1].iloc[[0, 1, 0]]
+
+    with pytest.raises(MergeMismatchError, match= f"1 keys are listed more than once in sheet {side}: AFG"):
+        list(join_chunks(_chunks(sheets[0], rows), _chunks(sheets[1], rows), "ISO", "MPI", max_pending= 4))
+
+def test_join_chunks_raises_when_too_many_rows_wait():
+    national, contributions = _sheets(["AFG", "BGD", "COL", "DZA"])
+    with pytest.raises(MemoryError):
+        list(join_chunks(_chunks(national, 2), _chunks(contributions.iloc[::-1], 2), "ISO", "MPI", max_pending= 1))
+
+def test_join_chunks_raises_past_max_keys():
+    national, contributions = _sheets(["AFG", "BGD", "COL", "DZA"])
+    with pytest.raises(MemoryError, match= "6 keys were read"):
+        list(join_chunks(_chunks(national, 1), _chunks(contributions, 1), "ISO", "MPI", max_pending= 4, max_keys= 5))
+
+def test_stream_rollups_raise_under_a_too_small_ceiling(monkeypatch):
+    monkeypatch.chdir(ROOT)
+    with pytest.raises(MemoryError):
+        stream_rollups(2023, memory_mib= 0.05)
+
+def test_stream_rollups_match_the_regional_outputs(monkeypatch):
+    monkeypatch.chdir(ROOT)
+    rollups = stream_rollups(2023, memory_mib= 0.5)
+    regionals = get_regionals(2023, gather_dfs(2023, cache_dir= None))
+
+    assert set(rollups.index) == {region for region, _ in regionals}
+    for (region, _), df in regionals.items():
+        assert rollups.loc[region, "Rows"] == len(df)
+        np.testing.assert_allclose(rollups.loc[region, ["MPI", "Health", "Education", "Living Standards"]],
+                                   [(df["MPI"] * df["Weight"]).sum(), df["Health_w"].sum(),
+                                    df["Education_w"].sum(), df["Living Standards_w"].sum()], rtol= 1e-12, atol= 1e-15)
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_store import write_partition
+from uncertainty import bootstrap, build_intervals
+
+COUNTRIES = pd.DataFrame({"Country": list("ABCDEF"), "Region": ["South Asia"] * 3 + ["Arab States"] * 3,
+                          "MPI": [0.05, 0.2, 0.35, 0.01, 0.1, 0.0], "MPI SE": [0.01, 0.02, 0.03, 0.002, 0.01, 0.0],
+                          "Population": [10.0, 30.0, 60.0, 5.0, 5.0, 10.0]})
+
+def _dataset(tmp_path, se_scale: float) -> str:
+    dataset_dir = str(tmp_path / f"mpi_{se_scale}")
+    for year, change in ((2022, 1.0), (2023, 0.9)):
+        df = COUNTRIES.assign(**{"MPI": COUNTRIES["MPI"] * change, "MPI SE": COUNTRIES["MPI SE"] * se_scale})
+        for region, rows in [*df.groupby("Region"), ("Global", df)]:
+            rows = rows.assign(Weight= rows["Population"] / rows["Population"].sum())
+            write_partition(rows[["Country", "MPI", "MPI SE", "Weight"]], region, year, dataset_dir)
+    return dataset_dir
+
+def test_bootstrap_depends_only_on_the_seed():
+    mpi, se, weights = np.array([0.1, 0.3]), np.array([0.02, 0.05]), np.array([[0.5], [0.5]])
+
+    first = bootstrap(mpi, se, weights, resamples= 3000, seed= 7, workers= 1)
+    np.testing.assert_array_equal(first, bootstrap(mpi, se, weights, resamples= 3000, seed= 7, workers= 4))
+    assert not np.array_equal(first, bootstrap(mpi, se, weights, resamples= 3000, seed= 8))
+
+def test_bootstrap_keeps_countries_without_an_error():
+    draws = bootstrap(np.array([0.0, 0.2]), np.array([0.0, 0.0]), np.array([[0.5], [0.5]]), resamples= 100)
+
+    np.testing.assert_allclose(draws, 0.1)
+
+def test_intervals_contain_the_estimate_and_shrink_with_the_error(tmp_path):
+    wide = build_intervals(_dataset(tmp_path, 1.0), resamples= 5000, seed= 3).set_index(["Region", "Year"])
+    narrow = build_intervals(_dataset(tmp_path, 0.1), resamples= 5000, seed= 3).set_index(["Region", "Year"])
+
+    for intervals in (wide, narrow):
+        assert (intervals["Lower"] <= intervals["MPI"]).all() and (intervals["MPI"] <= intervals["Upper"]).all()
+        assert intervals.xs(2022, level= "Year")["Delta % Lower"].isna().all()
+    assert ((narrow["Upper"] - narrow["Lower"]) < (wide["Upper"] - wide["Lower"]) / 5).all()
+    assert (narrow["SE"] < wide["SE"] / 5).all()
+    assert wide.loc[("global", 2023), "MPI"] == pytest.approx(0.9 * (COUNTRIES["MPI"] @ COUNTRIES["Population"]) / COUNTRIES["Population"].sum())
+
+    # the MPI fell by 10% everywhere, a change the narrow intervals resolve
+    change = narrow.xs(2023, level= "Year")
+    assert ((change["Delta % Lower"] < -10) & (-10 < change["Delta % Upper"]) & (change["Delta % Upper"] < 0)).all()